@@ -2,8 +2,8 @@ import discord
 from discord.ext import commands
 import logging
 from datetime import datetime, timedelta
-import json
 import asyncio
+import time
 from typing import Optional, List
 import io
 import psutil
@@ -28,6 +28,33 @@ from ext.base_handler import BaseLockHandler, BaseResponseHandler
 from ext.cache_manager import CacheManager
 from database import get_connection
 
+# Static replies, built once; never mutated after creation
+ACCESS_DENIED_EMBED = discord.Embed(
+    title="❌ Access Denied",
+    description="```diff\n- You don't have permission to use admin commands!```",
+    color=COLORS['error']
+)
+SYSTEM_BUSY_EMBED = discord.Embed(
+    title="⏳ System Busy",
+    description="```diff\n- System is busy, please try again later```",
+    color=COLORS['warning']
+)
+TIMEOUT_EMBED = discord.Embed(
+    title="⏰ Timeout",
+    description="```diff\n- Operation cancelled due to timeout```",
+    color=COLORS['error']
+)
+ADDING_STOCK_EMBED = discord.Embed(
+    title="⏳ Adding Stock",
+    description="Processing items...",
+    color=COLORS['info']
+)
+SENDING_ANNOUNCEMENT_EMBED = discord.Embed(
+    title="⏳ Sending Announcement",
+    description="Processing...",
+    color=COLORS['info']
+)
+
 class AdminCog(commands.Cog, BaseLockHandler, BaseResponseHandler):
     def __init__(self, bot):
         super().__init__()  # Initialize BaseLockHandler dan BaseResponseHandler
@@ -36,21 +63,13 @@ class AdminCog(commands.Cog, BaseLockHandler, BaseResponseHandler):
         
         # Initialize services dengan cache manager
         self.cache_manager = CacheManager()
-        self.balance_service = BalanceManagerService(bot)
-        self.product_service = ProductManagerService(bot)
-        self.trx_manager = TransactionManager(bot)
+        self.balance_service = BalanceManagerService.get(bot)
+        self.product_service = ProductManagerService.get(bot)
+        self.trx_manager = TransactionManager.get(bot)
         
-        # Load admin configuration dengan proper error handling
-        try:
-            with open('config.json') as f:
-                config = json.load(f)
-                self.admin_id = int(config.get('admin_id'))
-                if not self.admin_id:
-                    raise ValueError("admin_id not found in config.json")
-                self.logger.info(f"Admin ID loaded: {self.admin_id}")
-        except Exception as e:
-            self.logger.critical(f"Failed to load admin configuration: {e}")
-            raise
+        # config.json sudah dibaca dan divalidasi sekali saat startup (main.py)
+        self.admin_id = bot.admin_id
+        self.logger.info(f"Admin ID loaded: {self.admin_id}")
 
     async def _check_admin(self, ctx) -> bool:
         """Check if user has admin permissions with cache"""
@@ -62,12 +81,7 @@ class AdminCog(commands.Cog, BaseLockHandler, BaseResponseHandler):
             await self.cache_manager.set(cache_key, is_admin, expires_in=3600)
             
         if not is_admin:
-            embed = discord.Embed(
-                title="❌ Access Denied",
-                description="```diff\n- You don't have permission to use admin commands!```",
-                color=COLORS['error']
-            )
-            await self.send_response_once(ctx, embed=embed)
+            await self.send_response_once(ctx, embed=ACCESS_DENIED_EMBED)
             self.logger.warning(
                 f"Unauthorized access attempt by {ctx.author} (ID: {ctx.author.id})"
             )
@@ -75,21 +89,13 @@ class AdminCog(commands.Cog, BaseLockHandler, BaseResponseHandler):
 
     async def _process_command(self, ctx, command_name: str, callback) -> bool:
         """Process command with proper locking, caching, and response handling"""
-        if hasattr(ctx, 'is_being_processed'):
-            return False
-
-        ctx.is_being_processed = True
         cache_key = f"admin_command_{command_name}_{ctx.author.id}"
         lock = await self.acquire_lock(cache_key)
 
         if not lock:
             await self.send_response_once(
                 ctx, 
-                embed=discord.Embed(
-                    title="⏳ System Busy",
-                    description="```diff\n- System is busy, please try again later```",
-                    color=COLORS['warning']
-                )
+                embed=SYSTEM_BUSY_EMBED
             )
             return False
 
@@ -97,15 +103,8 @@ class AdminCog(commands.Cog, BaseLockHandler, BaseResponseHandler):
             if not await self._check_admin(ctx):
                 return False
 
-            response_lock = await self.acquire_response_lock(ctx)
-            if not response_lock:
-                return False
-
-            try:
-                await callback()
-                return True
-            finally:
-                self.release_response_lock(ctx)
+            await callback()
+            return True
 
         except Exception as e:
             self.logger.error(f"Error in {command_name}: {str(e)}", exc_info=True)
@@ -118,7 +117,6 @@ class AdminCog(commands.Cog, BaseLockHandler, BaseResponseHandler):
             return False
         finally:
             self.release_lock(cache_key)
-            delattr(ctx, 'is_being_processed')
 
     async def _process_stock_file(self, attachment) -> List[str]:
         """Process uploaded stock file with improved validation"""
@@ -167,11 +165,7 @@ class AdminCog(commands.Cog, BaseLockHandler, BaseResponseHandler):
         except asyncio.TimeoutError:
             await self.send_response_once(
                 ctx, 
-                embed=discord.Embed(
-                    title="⏰ Timeout",
-                    description="```diff\n- Operation cancelled due to timeout```",
-                    color=COLORS['error']
-                )
+                embed=TIMEOUT_EMBED
             )
             return False
 
@@ -183,7 +177,7 @@ class AdminCog(commands.Cog, BaseLockHandler, BaseResponseHandler):
                 title="🛠️ Admin Commands",
                 description="Available administrative commands",
                 color=COLORS['blue'],
-                timestamp=datetime.utcnow()
+                timestamp=discord.utils.utcnow()
             )
 
             command_categories = {
@@ -245,7 +239,7 @@ class AdminCog(commands.Cog, BaseLockHandler, BaseResponseHandler):
             embed = discord.Embed(
                 title="✅ World Added",
                 color=COLORS['success'],
-                timestamp=datetime.utcnow()
+                timestamp=discord.utils.utcnow()
             )
             
             embed.add_field(
@@ -281,7 +275,7 @@ class AdminCog(commands.Cog, BaseLockHandler, BaseResponseHandler):
             embed = discord.Embed(
                 title="✅ Product Added",
                 color=COLORS['success'],
-                timestamp=datetime.utcnow()
+                timestamp=discord.utils.utcnow()
             )
             
             embed.add_field(
@@ -321,39 +315,16 @@ class AdminCog(commands.Cog, BaseLockHandler, BaseResponseHandler):
             # Process stock file
             items = await self._process_stock_file(ctx.message.attachments[0])
 
-            # Add stock with progress updates
-            progress_msg = await ctx.send(
-                embed=discord.Embed(
-                    title="⏳ Adding Stock",
-                    description="Processing items...",
-                    color=COLORS['info']
-                )
-            )
+            # Placeholder while the batch insert runs
+            progress_msg = await ctx.send(embed=ADDING_STOCK_EMBED)
             
-            added_count = 0
-            failed_count = 0
-            error_items = []
-
-            for i, item in enumerate(items, 1):
-                try:
-                    await self.product_service.add_stock_item(
-                        code,
-                        item,
-                        str(ctx.author.id)
-                    )
-                    added_count += 1
-                except Exception as e:
-                    failed_count += 1
-                    error_items.append(f"Item {i}: {str(e)}")
-
-                if i % 10 == 0:
-                    await progress_msg.edit(
-                        embed=discord.Embed(
-                            title="⏳ Adding Stock",
-                            description=f"Processing... {i}/{len(items)} items",
-                            color=COLORS['info']
-                        )
-                    )
+            # One transaction for the whole file instead of one per item
+            added_count, error_items = await self.product_service.add_stock_items(
+                code,
+                items,
+                str(ctx.author.id)
+            )
+            failed_count = len(error_items)
 
             await progress_msg.delete()
 
@@ -361,7 +332,7 @@ class AdminCog(commands.Cog, BaseLockHandler, BaseResponseHandler):
             embed = discord.Embed(
                 title="✅ Stock Added",
                 color=COLORS['success'],
-                timestamp=datetime.utcnow()
+                timestamp=discord.utils.utcnow()
             )
             
             embed.add_field(
@@ -421,7 +392,7 @@ class AdminCog(commands.Cog, BaseLockHandler, BaseResponseHandler):
             embed = discord.Embed(
                 title="✅ Balance Added",
                 color=COLORS['success'],
-                timestamp=datetime.utcnow()
+                timestamp=discord.utils.utcnow()
             )
             
             embed.add_field(
@@ -469,7 +440,7 @@ class AdminCog(commands.Cog, BaseLockHandler, BaseResponseHandler):
             embed = discord.Embed(
                 title="✅ Balance Removed",
                 color=COLORS['error'],
-                timestamp=datetime.utcnow()
+                timestamp=discord.utils.utcnow()
             )
             
             embed.add_field(
@@ -506,7 +477,7 @@ class AdminCog(commands.Cog, BaseLockHandler, BaseResponseHandler):
             embed = discord.Embed(
                 title=f"👤 User Information - {growid}",
                 color=COLORS['info'],
-                timestamp=datetime.utcnow()
+                timestamp=discord.utils.utcnow()
             )
             
             embed.add_field(
@@ -558,7 +529,7 @@ class AdminCog(commands.Cog, BaseLockHandler, BaseResponseHandler):
             embed = discord.Embed(
                 title="✅ Balance Reset",
                 color=COLORS['error'],
-                timestamp=datetime.utcnow()
+                timestamp=discord.utils.utcnow()
             )
             
             embed.add_field(
@@ -593,12 +564,12 @@ class AdminCog(commands.Cog, BaseLockHandler, BaseResponseHandler):
             disk = psutil.disk_usage('/')
             
             # Get bot info
-            uptime = datetime.utcnow() - self.bot.startup_time
+            uptime = timedelta(seconds=int(time.monotonic() - self.bot.startup_time))
             
             embed = discord.Embed(
                 title="🤖 System Information",
                 color=COLORS['info'],
-                timestamp=datetime.utcnow()
+                timestamp=discord.utils.utcnow()
             )
             
             # System Stats
@@ -621,7 +592,7 @@ class AdminCog(commands.Cog, BaseLockHandler, BaseResponseHandler):
                 name="🤖 Bot Status",
                 value=(
                     f"```yml\n"
-                    f"Uptime: {str(uptime).split('.')[0]}\n"
+                    f"Uptime: {uptime}\n"
                     f"Latency: {round(self.bot.latency * 1000)}ms\n"
                     f"Servers: {len(self.bot.guilds)}\n"
                     f"Commands: {len(self.bot.commands)}\n"
@@ -665,20 +636,14 @@ class AdminCog(commands.Cog, BaseLockHandler, BaseResponseHandler):
                 title="📢 Announcement",
                 description=message,
                 color=COLORS['warning'],
-                timestamp=datetime.utcnow()
+                timestamp=discord.utils.utcnow()
             )
             embed.set_footer(text=f"Sent by {ctx.author}")
 
             sent_count = 0
             failed_count = 0
 
-            progress_msg = await ctx.send(
-                embed=discord.Embed(
-                    title="⏳ Sending Announcement",
-                    description="Processing...",
-                    color=COLORS['info']
-                )
-            )
+            progress_msg = await ctx.send(embed=SENDING_ANNOUNCEMENT_EMBED)
 
             for user_data in users:
                 try:
@@ -705,7 +670,7 @@ class AdminCog(commands.Cog, BaseLockHandler, BaseResponseHandler):
             result_embed = discord.Embed(
                 title="📢 Announcement Results",
                 color=COLORS['success'],
-                timestamp=datetime.utcnow()
+                timestamp=discord.utils.utcnow()
             )
             
             result_embed.add_field(
@@ -756,7 +721,7 @@ class AdminCog(commands.Cog, BaseLockHandler, BaseResponseHandler):
                         f"**{mode_lower.upper()}**"
                     ),
                     color=COLORS['warning'] if mode_lower == "on" else COLORS['success'],
-                    timestamp=datetime.utcnow()
+                    timestamp=discord.utils.utcnow()
                 )
                 embed.set_footer(text=f"Changed by {ctx.author}")
                 
@@ -846,7 +811,7 @@ class AdminCog(commands.Cog, BaseLockHandler, BaseResponseHandler):
                         f"the blacklist."
                     ),
                     color=COLORS['error'] if action_lower == 'add' else COLORS['success'],
-                    timestamp=datetime.utcnow()
+                    timestamp=discord.utils.utcnow()
                 )
                 embed.set_footer(text=f"Updated by {ctx.author}")
                 
@@ -881,7 +846,7 @@ class AdminCog(commands.Cog, BaseLockHandler, BaseResponseHandler):
                 embed = discord.Embed(
                     title="💾 Database Backup",
                     color=COLORS['success'],
-                    timestamp=datetime.utcnow()
+                    timestamp=discord.utils.utcnow()
                 )
                 
                 embed.add_field(
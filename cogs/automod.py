@@ -1,78 +1,143 @@
 import discord
 from discord.ext import commands
-from datetime import datetime, timedelta
 import json
+import copy
+from datetime import datetime
+import time
+import heapq
+from collections import deque
 import asyncio
+import re
+import aiofiles
+from cachetools import LRUCache
+from pathlib import Path
+from typing import List, Tuple
 from .utils import Embed, Permissions, event_dispatcher
-from database import get_connection
+from database import db_pool
+from ext.base_handler import LockCache, MAX_TRACKED_USERS
 import sqlite3
 from asyncio import Lock
 
+CONFIG_PATH = Path('config/automod.json')
+CONFIG_FLUSH_DELAY = 0.25  # seconds, collapses bursts of config edits into one write
+WARNING_FLUSH_INTERVAL = 0.2  # seconds
+WARNING_BATCH_SIZE = 500
+WARNING_WINDOW = 86400  # seconds, warnings older than this don't count toward a mute
+CAPS_TABLE = bytes(1 if 65 <= i <= 90 else 0 for i in range(256))
+VIOLATION_QUEUE_SIZE = 200
+VIOLATION_WORKERS = 4
+
+DEFAULT_CONFIG = {
+    "enabled": True,
+    "spam": {
+        "enabled": True,
+        "threshold": 5,
+        "timeframe": 5  # seconds
+    },
+    "caps": {
+        "enabled": True,
+        "threshold": 0.7,
+        "min_length": 10
+    },
+    "banned_words": {
+        "enabled": True,
+        "words": [],
+        "wildcards": []
+    },
+    "punishments": {
+        "warn_threshold": 3,
+        "mute_duration": 10  # minutes
+    }
+}
+
+def compile_banned_matcher(words: List[str], wildcards: List[str]):
+    """Compile banned words and wildcards into one case-folded pattern, or None"""
+    patterns = [re.escape(word.lower()) for word in words]
+    patterns += [
+        re.escape(wildcard.lower()).replace(r'\*', r'\S*')
+        for wildcard in wildcards
+    ]
+    if not patterns:
+        return None
+    # Longest patterns first so the reported word is the most specific match
+    patterns.sort(key=len, reverse=True)
+    # "Not inside a word" rather than \b, which never matches at an edge
+    # that is itself punctuation or emoji (e.g. "f*ck!", ".exe", "@everyone")
+    return re.compile(r'(?<!\w)(?:' + '|'.join(patterns) + r')(?!\w)')
+
 class AutoMod(commands.Cog):
     """🛡️ Sistem Moderasi Otomatis"""
     
     def __init__(self, bot):
         self.bot = bot
-        self.spam_check = {}
-        self.config = self.load_config()
+        self.spam_check = LRUCache(maxsize=MAX_TRACKED_USERS)
+        self.config = copy.deepcopy(DEFAULT_CONFIG)
         self.register_handlers()
-        self.locks = {}
-        self.spam_locks = {}
-        self.mute_locks = {}
+        self.locks = LockCache(maxsize=MAX_TRACKED_USERS)
+        self._muted_role_ids = {}
+        self._muted_role_creating = {}
+        self._warning_template = Embed.create(
+            title="⚠️ AutoMod Warning",
+            color=discord.Color.orange()
+        )
+        self._unmute_heap = []
+        self._unmute_due = {}
+        self._unmute_wakeup = asyncio.Event()
+        self._unmute_task = None
+        self._violation_q = asyncio.Queue(maxsize=VIOLATION_QUEUE_SIZE)
+        self._violation_workers = []
         self.config_lock = Lock()
+        self._dirty = asyncio.Event()
+        self._writer_task = None
+        self._banned_matcher = None
+        self._rebuild_matcher()
+        self._warning_buf = asyncio.Queue()
+        self._warning_times = LRUCache(maxsize=MAX_TRACKED_USERS)
+        self._warning_task = None
+
+    async def cog_load(self):
+        """Load config from disk and start the background writers"""
+        self.config = await self.load_config()
+        self._rebuild_matcher()
+        self._writer_task = asyncio.create_task(self._config_writer())
+        self._warning_task = asyncio.create_task(self._warning_writer())
+        await self._load_scheduled_unmutes()
+        self._unmute_task = asyncio.create_task(self._unmute_scheduler())
+        self._violation_workers = [
+            asyncio.create_task(self._violation_worker())
+            for _ in range(VIOLATION_WORKERS)
+        ]
+
+    async def cog_unload(self):
+        """Stop the background writers and flush any pending changes"""
+        for task in (self._writer_task, self._warning_task, self._unmute_task, *self._violation_workers):
+            if task:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        if self._dirty.is_set():
+            await self.save_config()
+        while not self._warning_buf.empty():
+            await self._flush_warnings()
 
     def register_handlers(self):
         """Register event handlers with dispatcher"""
         event_dispatcher.register('message', self.handle_message, priority=1)
-        event_dispatcher.register('automod_violation', self.handle_violation, priority=1)
 
     async def get_user_lock(self, user_id: int) -> Lock:
         """Get a lock for a specific user"""
-        if user_id not in self.locks:
-            self.locks[user_id] = Lock()
-        return self.locks[user_id]
-
-    async def get_spam_lock(self, user_id: int) -> Lock:
-        """Get a spam check lock for a specific user"""
-        if user_id not in self.spam_locks:
-            self.spam_locks[user_id] = Lock()
-        return self.spam_locks[user_id]
-
-    async def get_mute_lock(self, guild_id: int) -> Lock:
-        """Get a mute lock for a specific guild"""
-        if guild_id not in self.mute_locks:
-            self.mute_locks[guild_id] = Lock()
-        return self.mute_locks[guild_id]
-
-    def load_config(self) -> dict:
+        return self.locks.setdefault(user_id, Lock())
+
+    async def load_config(self) -> dict:
         """Load automod configuration"""
         try:
-            with open('config/automod.json', 'r') as f:
-                return json.load(f)
+            async with aiofiles.open(CONFIG_PATH, 'r') as f:
+                return json.loads(await f.read())
         except FileNotFoundError:
-            default = {
-                "enabled": True,
-                "spam": {
-                    "enabled": True,
-                    "threshold": 5,
-                    "timeframe": 5  # seconds
-                },
-                "caps": {
-                    "enabled": True,
-                    "threshold": 0.7,
-                    "min_length": 10
-                },
-                "banned_words": {
-                    "enabled": True,
-                    "words": [],
-                    "wildcards": []
-                },
-                "punishments": {
-                    "warn_threshold": 3,
-                    "mute_duration": 10  # minutes
-                }
-            }
-            self.save_config(default)
+            default = copy.deepcopy(DEFAULT_CONFIG)
+            self._dirty.set()
             return default
 
     async def save_config(self, config: dict = None):
@@ -80,8 +145,102 @@ class AutoMod(commands.Cog):
         async with self.config_lock:
             if config is None:
                 config = self.config
-            with open('config/automod.json', 'w') as f:
-                json.dump(config, f, indent=4)
+            self._dirty.clear()
+            data = json.dumps(config, indent=4)
+        CONFIG_PATH.parent.mkdir(parents=True, exist_ok=True)
+        async with aiofiles.open(CONFIG_PATH, 'w') as f:
+            await f.write(data)
+
+    async def _config_writer(self):
+        """Flush config changes to disk, merging rapid edits into a single write"""
+        while True:
+            await self._dirty.wait()
+            await asyncio.sleep(CONFIG_FLUSH_DELAY)
+            try:
+                await self.save_config()
+            except OSError as e:
+                await event_dispatcher.dispatch('error', None, e)
+
+    async def _warning_writer(self):
+        """Insert buffered warnings in batches, one transaction per batch"""
+        while True:
+            rows = [await self._warning_buf.get()]
+            try:
+                await asyncio.sleep(WARNING_FLUSH_INTERVAL)
+            finally:
+                try:
+                    await self._flush_warnings(rows)
+                except sqlite3.Error as e:
+                    await event_dispatcher.dispatch('error', None, e)
+
+    async def _flush_warnings(self, rows: list = None):
+        """Write up to WARNING_BATCH_SIZE buffered warnings"""
+        rows = rows or []
+        while not self._warning_buf.empty() and len(rows) < WARNING_BATCH_SIZE:
+            rows.append(self._warning_buf.get_nowait())
+        if not rows:
+            return
+
+        def insert(conn):
+            conn.executemany("""
+                INSERT INTO warnings (user_id, guild_id, warning_type, reason)
+                VALUES (?, ?, ?, ?)
+            """, rows)
+            conn.commit()
+
+        await db_pool.run(insert)
+
+    async def _record_warning(self, user_id: int, guild_id: int, count: int = 1) -> int:
+        """Record warnings and return the user's warning count for the last day"""
+        key = (user_id, guild_id)
+        now = time.monotonic()
+        timestamps = self._warning_times.get(key)
+
+        if timestamps is None:
+            # Seed from warnings persisted before this process started
+            def query(conn):
+                cursor = conn.cursor()
+                cursor.execute("""
+                    SELECT timestamp FROM warnings
+                    WHERE user_id = ? AND guild_id = ?
+                    AND timestamp > datetime('now', '-1 day')
+                    ORDER BY timestamp
+                """, (user_id, guild_id))
+                return cursor.fetchall()
+
+            rows = await db_pool.run(query)
+            utcnow = datetime.utcnow()
+            timestamps = self._warning_times[key] = deque(
+                now - (utcnow - datetime.fromisoformat(row[0])).total_seconds()
+                for row in rows
+            )
+
+        while timestamps and now - timestamps[0] >= WARNING_WINDOW:
+            timestamps.popleft()
+        timestamps.extend([now] * count)
+        return len(timestamps)
+
+    def _rebuild_matcher(self):
+        """Compile banned words and wildcards into a single pattern"""
+        banned = self.config["banned_words"]
+        self._banned_matcher = compile_banned_matcher(banned["words"], banned["wildcards"])
+
+    async def check_caps(self, message: discord.Message) -> bool:
+        """Check for excessive use of capital letters"""
+        content = message.content
+        if len(content) < self.config["caps"]["min_length"]:
+            return False
+
+        # Map A-Z to 1 and everything else to 0, then sum in C
+        n_upper = sum(content.encode('ascii', 'ignore').translate(CAPS_TABLE))
+        return n_upper / len(content) >= self.config["caps"]["threshold"]
+
+    async def check_banned_words(self, message: discord.Message):
+        """Return the first banned word found in the message, if any"""
+        if self._banned_matcher is None:
+            return None
+        match = self._banned_matcher.search(message.content.lower())
+        return match.group(0) if match else None
 
     async def handle_message(self, message: discord.Message):
         """Main message handler for automod"""
@@ -109,47 +268,48 @@ class AutoMod(commands.Cog):
                 if word := await self.check_banned_words(message):
                     violations.append(("banned_word", f"Used banned word: {word}"))
 
-            # Handle any violations
-            for violation_type, reason in violations:
-                await event_dispatcher.dispatch('automod_violation', message, violation_type, reason)
+        # Hand off to the violation workers after releasing the user lock;
+        # blocks when the queue is full so a message flood slows intake
+        if violations:
+            await self._violation_q.put((message, violations))
+
+    async def _violation_worker(self):
+        """Process queued violations"""
+        while True:
+            message, violations = await self._violation_q.get()
+            try:
+                await self.handle_violation(message, violations)
+            finally:
+                self._violation_q.task_done()
 
     async def check_spam(self, message: discord.Message) -> bool:
         """Check for spam messages"""
-        author_id = str(message.author.id)
-        current_time = datetime.utcnow()
         threshold = self.config["spam"]["threshold"]
         timeframe = self.config["spam"]["timeframe"]
+        now = time.monotonic()
 
-        async with await self.get_spam_lock(message.author.id):
-            # Initialize or clean up old messages
-            if author_id not in self.spam_check:
-                self.spam_check[author_id] = []
-
-            # Remove old messages
-            self.spam_check[author_id] = [
-                msg_time for msg_time in self.spam_check[author_id]
-                if current_time - msg_time < timedelta(seconds=timeframe)
-            ]
-
-            # Add new message
-            self.spam_check[author_id].append(current_time)
+        # Caller already holds the per-user lock
+        timestamps = self.spam_check.get(message.author.id)
+        if timestamps is None or timestamps.maxlen != threshold:
+            timestamps = self.spam_check[message.author.id] = deque(maxlen=threshold)
 
-            # Check if threshold is exceeded
-            return len(self.spam_check[author_id]) >= threshold
+        timestamps.append(now)
+        return len(timestamps) == threshold and now - timestamps[0] < timeframe
 
-    async def handle_violation(self, message: discord.Message, violation_type: str, reason: str):
-        """Handle automod violations"""
+    async def handle_violation(self, message: discord.Message, violations: List[Tuple[str, str]]):
+        """Handle all automod violations for a single message"""
         try:
             async with await self.get_user_lock(message.author.id):
-                # Create warning embed
-                embed = Embed.create(
-                    title="⚠️ AutoMod Warning",
-                    description=f"Violation detected in {message.channel.mention}",
-                    color=discord.Color.orange(),
-                    field_User=message.author.mention,
-                    field_Type=violation_type.title(),
-                    field_Reason=reason
+                # Create warning embed from the prebuilt template
+                embed = self._warning_template.copy()
+                embed.description = f"Violation detected in {message.channel.mention}"
+                embed.timestamp = discord.utils.utcnow()
+                embed.add_field(name="User", value=message.author.mention)
+                embed.add_field(
+                    name="Type",
+                    value=", ".join(violation_type.title() for violation_type, _ in violations)
                 )
+                embed.add_field(name="Reason", value="\n".join(reason for _, reason in violations))
 
                 # Delete violating message
                 try:
@@ -164,75 +324,181 @@ class AutoMod(commands.Cog):
                 except discord.Forbidden:
                     pass
 
-                # Log warning to database
-                conn = None
-                try:
-                    conn = get_connection()
-                    cursor = conn.cursor()
-                    
-                    cursor.execute("""
-                        INSERT INTO warnings (user_id, guild_id, warning_type, reason)
-                        VALUES (?, ?, ?, ?)
-                    """, (str(message.author.id), str(message.guild.id), violation_type, reason))
-                    conn.commit()
-
-                    # Check warning threshold
-                    cursor.execute("""
-                        SELECT COUNT(*) FROM warnings
-                        WHERE user_id = ? AND guild_id = ?
-                        AND timestamp > datetime('now', '-1 day')
-                    """, (str(message.author.id), str(message.guild.id)))
-                    warning_count = cursor.fetchone()[0]
-
-                    if warning_count >= self.config["punishments"]["warn_threshold"]:
-                        await self.mute_user(message.author)
-                finally:
-                    if conn:
-                        conn.close()
+                # Queue warnings for the batched writer
+                warning_count = await self._record_warning(
+                    message.author.id, message.guild.id, len(violations)
+                )
+                user_id, guild_id = message.author.id, message.guild.id
+                for violation_type, reason in violations:
+                    await self._warning_buf.put((user_id, guild_id, violation_type, reason))
+
+                # mute_user only schedules the unmute, so it can run under the user lock
+                if warning_count >= self.config["punishments"]["warn_threshold"]:
+                    await self.mute_user(message.author)
 
         except Exception as e:
             await event_dispatcher.dispatch('error', None, e)
 
-    async def mute_user(self, member: discord.Member):
-        """Mute a user for the configured duration"""
-        async with await self.get_mute_lock(member.guild.id):
-            muted_role = discord.utils.get(member.guild.roles, name="Muted")
+    async def get_muted_role(self, guild: discord.Guild):
+        """Get the guild's Muted role, creating it on first use"""
+        role_id = self._muted_role_ids.get(guild.id)
+        muted_role = guild.get_role(role_id) if role_id else None
+        if muted_role:
+            return muted_role
+
+        muted_role = discord.utils.get(guild.roles, name="Muted")
+        if not muted_role:
+            # Share one in-flight creation between concurrent mutes in the same guild
+            task = self._muted_role_creating.get(guild.id)
+            if task is None:
+                task = asyncio.create_task(self._create_muted_role(guild))
+                self._muted_role_creating[guild.id] = task
+                task.add_done_callback(lambda _: self._muted_role_creating.pop(guild.id, None))
+            muted_role = await asyncio.shield(task)
             if not muted_role:
-                # Create muted role if it doesn't exist
+                return None
+
+        self._muted_role_ids[guild.id] = muted_role.id
+        return muted_role
+
+    async def _create_muted_role(self, guild: discord.Guild):
+        """Create the Muted role and deny sending in every channel"""
+        try:
+            muted_role = await guild.create_role(
+                name="Muted",
+                permissions=discord.Permissions.none(),
+                reason="AutoMod: Created muted role"
+            )
+            # Roles can only grant, so the deny has to be a channel overwrite.
+            # Issue them concurrently; discord.py still honours each route's ratelimit.
+            await asyncio.gather(*(
+                channel.set_permissions(muted_role, send_messages=False)
+                for channel in guild.channels
+            ))
+            return muted_role
+        except discord.Forbidden:
+            return None
+
+    @commands.Cog.listener()
+    async def on_guild_role_delete(self, role: discord.Role):
+        """Forget a cached Muted role once it is deleted"""
+        if self._muted_role_ids.get(role.guild.id) == role.id:
+            del self._muted_role_ids[role.guild.id]
+
+    async def _load_scheduled_unmutes(self):
+        """Restore pending unmutes persisted before the last restart"""
+        def query(conn):
+            cursor = conn.cursor()
+            cursor.execute("SELECT user_id, guild_id, unmute_at FROM scheduled_unmutes")
+            return cursor.fetchall()
+
+        for user_id, guild_id, unmute_at in await db_pool.run(query):
+            self._push_unmute(guild_id, user_id, unmute_at)
+
+    def _push_unmute(self, guild_id: int, user_id: int, unmute_at: float):
+        """Add an unmute to the timer heap and wake the scheduler"""
+        self._unmute_due[(guild_id, user_id)] = unmute_at
+        heapq.heappush(self._unmute_heap, (unmute_at, guild_id, user_id))
+        self._unmute_wakeup.set()
+
+    async def schedule_unmute(self, member: discord.Member, delay: float):
+        """Persist and schedule an unmute `delay` seconds from now"""
+        # Wall-clock time so the schedule survives restarts
+        unmute_at = time.time() + delay
+
+        def insert(conn):
+            conn.execute("""
+                INSERT OR REPLACE INTO scheduled_unmutes (user_id, guild_id, unmute_at)
+                VALUES (?, ?, ?)
+            """, (member.id, member.guild.id, unmute_at))
+            conn.commit()
+
+        await db_pool.run(insert)
+        self._push_unmute(member.guild.id, member.id, unmute_at)
+
+    async def _unmute_scheduler(self):
+        """Single task that lifts every scheduled mute when it is due"""
+        await self.bot.wait_until_ready()
+        while True:
+            if not self._unmute_heap:
+                await self._unmute_wakeup.wait()
+                self._unmute_wakeup.clear()
+                continue
+
+            unmute_at, guild_id, user_id = self._unmute_heap[0]
+            delay = unmute_at - time.time()
+            if delay > 0:
+                # Sleep until due, or until an earlier unmute is scheduled
                 try:
-                    muted_role = await member.guild.create_role(
-                        name="Muted",
-                        reason="AutoMod: Created muted role"
-                    )
-                    # Set permissions for all channels
-                    for channel in member.guild.channels:
-                        await channel.set_permissions(muted_role, send_messages=False)
-                except discord.Forbidden:
-                    return
+                    await asyncio.wait_for(self._unmute_wakeup.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                self._unmute_wakeup.clear()
+                continue
+
+            heapq.heappop(self._unmute_heap)
+            # Skip entries superseded by a later re-mute
+            if self._unmute_due.get((guild_id, user_id)) != unmute_at:
+                continue
+            del self._unmute_due[(guild_id, user_id)]
 
             try:
-                # Apply mute
-                await member.add_roles(muted_role, reason="AutoMod: Exceeded warning threshold")
-                
-                # Create notification embed
-                embed = Embed.create(
-                    title="🔇 User Muted",
-                    description=f"{member.mention} has been muted for {self.config['punishments']['mute_duration']} minutes",
-                    color=discord.Color.red()
-                )
-                
-                # Send notification
-                log_channel = member.guild.system_channel
-                if log_channel:
-                    await log_channel.send(embed=embed)
-
-                # Schedule unmute
-                await asyncio.sleep(self.config["punishments"]["mute_duration"] * 60)
-                await member.remove_roles(muted_role, reason="AutoMod: Mute duration expired")
+                await self._unmute(guild_id, user_id)
+            except Exception as e:
+                await event_dispatcher.dispatch('error', None, e)
+
+    async def _unmute(self, guild_id: int, user_id: int):
+        """Remove the Muted role and drop the persisted schedule"""
+        def delete(conn):
+            conn.execute(
+                "DELETE FROM scheduled_unmutes WHERE user_id = ? AND guild_id = ?",
+                (user_id, guild_id)
+            )
+            conn.commit()
+
+        await db_pool.run(delete)
+
+        guild = self.bot.get_guild(guild_id)
+        member = guild.get_member(user_id) if guild else None
+        if not member:
+            return
 
-            except discord.Forbidden:
+        role_id = self._muted_role_ids.get(guild_id)
+        muted_role = guild.get_role(role_id) if role_id else discord.utils.get(guild.roles, name="Muted")
+        if muted_role:
+            try:
+                await member.remove_roles(muted_role, reason="AutoMod: Mute duration expired")
+            except (discord.Forbidden, discord.NotFound):
                 pass
 
+    async def mute_user(self, member: discord.Member):
+        """Mute a user for the configured duration"""
+        muted_role = await self.get_muted_role(member.guild)
+        if not muted_role:
+            return
+
+        try:
+            # Apply mute
+            await member.add_roles(muted_role, reason="AutoMod: Exceeded warning threshold")
+            
+            # Create notification embed
+            embed = Embed.create(
+                title="🔇 User Muted",
+                description=f"{member.mention} has been muted for {self.config['punishments']['mute_duration']} minutes",
+                color=discord.Color.red()
+            )
+            
+            # Send notification
+            log_channel = member.guild.system_channel
+            if log_channel:
+                await log_channel.send(embed=embed)
+
+            # Schedule unmute
+            await self.schedule_unmute(member, self.config["punishments"]["mute_duration"] * 60)
+
+        except discord.Forbidden:
+            pass
+
     @commands.group(name="automod")
     @commands.has_permissions(administrator=True)
     async def automod(self, ctx):
@@ -245,7 +511,7 @@ class AutoMod(commands.Cog):
         """Toggle AutoMod on/off"""
         async with self.config_lock:
             self.config["enabled"] = state
-            await self.save_config()
+            self._dirty.set()
         await ctx.send(f"✅ AutoMod has been {'enabled' if state else 'disabled'}")
 
     @automod.command(name="addword")
@@ -253,7 +519,8 @@ class AutoMod(commands.Cog):
         """Add a word to the banned list"""
         async with self.config_lock:
             self.config["banned_words"]["words"].append(word.lower())
-            await self.save_config()
+            self._rebuild_matcher()
+            self._dirty.set()
         await ctx.send(f"✅ Added '{word}' to banned words")
 
     @automod.command(name="removeword")
@@ -262,7 +529,8 @@ class AutoMod(commands.Cog):
         async with self.config_lock:
             try:
                 self.config["banned_words"]["words"].remove(word.lower())
-                await self.save_config()
+                self._rebuild_matcher()
+                self._dirty.set()
                 await ctx.send(f"✅ Removed '{word}' from banned words")
             except ValueError:
                 await ctx.send("❌ Word not found in banned words list")
@@ -3,9 +3,10 @@ from discord.ext import commands
 import sqlite3
 from datetime import datetime
 import random
+import time
 import asyncio
 from typing import Optional, Dict, List
-from .utils import Embed, event_dispatcher
+from .utils import Embed, event_dispatcher, cooldown_cache
 from database import get_connection
 import logging
 
@@ -16,7 +17,8 @@ class Leveling(commands.Cog):
     
     def __init__(self, bot):
         self.bot = bot
-        self.xp_cooldown = {}
+        # guild-user -> cooldown deadline
+        self.xp_cooldown = cooldown_cache()
         self.register_handlers()
 
     def setup_tables(self):
@@ -204,13 +206,11 @@ class Leveling(commands.Cog):
         # Check cooldown
         user_id = str(message.author.id)
         guild_id = str(message.guild.id)
-        current_time = datetime.utcnow()
+        now = time.monotonic()
         
         cooldown_key = f"{guild_id}-{user_id}"
         if cooldown_key in self.xp_cooldown:
-            time_diff = (current_time - self.xp_cooldown[cooldown_key]).total_seconds()
-            if time_diff < settings['cooldown']:
-                return
+            return
                 
         # Check ignored channels
         if settings['ignored_channels']:
@@ -224,6 +224,7 @@ class Leveling(commands.Cog):
             if any(str(role.id) in ignored_roles for role in message.author.roles):
                 return
         
+        current_time = datetime.utcnow()
         conn = None
         try:
             conn = get_connection()
@@ -276,7 +277,7 @@ class Leveling(commands.Cog):
                     await self.handle_level_up(message.author, new_level)
             
             conn.commit()
-            self.xp_cooldown[cooldown_key] = current_time
+            self.xp_cooldown[cooldown_key] = now + settings['cooldown']
             
         except sqlite3.Error as e:
             logger.error(f"Failed to update user XP: {e}")
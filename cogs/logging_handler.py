@@ -1,7 +1,9 @@
 import discord
 from discord.ext import commands
 import logging
+import queue
 import sys
+from logging.handlers import QueueHandler, QueueListener
 from datetime import datetime
 from .utils import Embed, event_dispatcher
 from typing import Optional, Dict, Any
@@ -23,6 +25,7 @@ class EnhancedLoggingHandler(commands.Cog):
         self.performance_metrics = {}
         self.command_history = []
         self.error_count = {}
+        self._log_listeners = []
         self.setup_logging()
         self.register_events()
 
@@ -71,9 +74,7 @@ class EnhancedLoggingHandler(commands.Cog):
         debug_handler.setLevel(logging.DEBUG)
         
         # Tambahkan semua handler
-        self.logger.addHandler(file_handler)
-        self.logger.addHandler(terminal_handler)
-        self.logger.addHandler(debug_handler)
+        self._add_queued_handlers(self.logger, file_handler, terminal_handler, debug_handler)
         
         # Setup activity logger
         self.activity_logger = logging.getLogger('activity')
@@ -83,7 +84,7 @@ class EnhancedLoggingHandler(commands.Cog):
             mode='a'
         )
         activity_handler.setFormatter(file_formatter)
-        self.activity_logger.addHandler(activity_handler)
+        self._add_queued_handlers(self.activity_logger, activity_handler)
         
         # Performance logger
         self.perf_logger = logging.getLogger('performance')
@@ -93,8 +94,25 @@ class EnhancedLoggingHandler(commands.Cog):
             mode='a'
         )
         perf_handler.setFormatter(file_formatter)
-        self.perf_logger.addHandler(perf_handler)
-        self.perf_logger.addHandler(terminal_handler)
+        self._add_queued_handlers(self.perf_logger, perf_handler, terminal_handler)
+
+    def _add_queued_handlers(self, logger: logging.Logger, *handlers: logging.Handler):
+        """Pasang handler lewat queue; file/terminal I/O jalan di thread listener"""
+        log_queue = queue.SimpleQueue()
+        queue_handler = QueueHandler(log_queue)
+        logger.addHandler(queue_handler)
+        listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+        listener.start()
+        self._log_listeners.append((logger, queue_handler, listener))
+
+    async def cog_unload(self):
+        """Stop listener threads and detach handlers so a reload doesn't duplicate them"""
+        for logger, queue_handler, listener in self._log_listeners:
+            logger.removeHandler(queue_handler)
+            listener.stop()
+            for handler in listener.handlers:
+                handler.close()
+        self._log_listeners.clear()
 
     def register_events(self):
         """Register event handlers"""
@@ -121,7 +139,7 @@ class EnhancedLoggingHandler(commands.Cog):
 
     async def log_command(self, ctx):
         """Log command usage with performance tracking"""
-        timestamp = time.time()
+        timestamp = time.monotonic()
         cmd_name = ctx.command.name if ctx.command else "Unknown"
         
         # Start performance tracking
@@ -141,6 +159,7 @@ class EnhancedLoggingHandler(commands.Cog):
         # Track command history
         self.command_history.append({
             "timestamp": datetime.utcnow().isoformat(),
+            "monotonic": timestamp,
             "command": cmd_name,
             "author": str(ctx.author),
             "channel": str(ctx.channel),
@@ -200,7 +219,7 @@ class EnhancedLoggingHandler(commands.Cog):
     async def debugstats(self, ctx):
         """Show debug statistics"""
         # Calculate command execution times
-        current_time = time.time()
+        current_time = time.monotonic()
         for cmd, start_time in self.performance_metrics.items():
             if isinstance(start_time, float):
                 duration = current_time - start_time
@@ -213,14 +232,15 @@ class EnhancedLoggingHandler(commands.Cog):
         embed = discord.Embed(
             title="🔍 Debug Statistics",
             color=discord.Color.blue(),
-            timestamp=datetime.utcnow()
+            timestamp=discord.utils.utcnow()
         )
 
         # Command stats
         total_commands = len(self.command_history)
+        hour_ago = time.monotonic() - 3600
         recent_commands = len([
             cmd for cmd in self.command_history 
-            if (datetime.utcnow() - datetime.fromisoformat(cmd['timestamp'])).total_seconds() < 3600
+            if cmd['monotonic'] > hour_ago
         ])
         
         embed.add_field(
@@ -1,6 +1,5 @@
 import discord
 from discord.ext import commands
-import asyncio
 from datetime import datetime, timedelta
 from typing import Optional, List, Dict
 from .utils import Embed, event_dispatcher
@@ -416,9 +415,7 @@ class Management(commands.Cog):
             
         deleted = await ctx.channel.purge(limit=amount + 1)  # +1 for command message
         
-        msg = await ctx.send(f"✅ Deleted {len(deleted) - 1} messages")
-        await asyncio.sleep(3)
-        await msg.delete()
+        await ctx.send(f"✅ Deleted {len(deleted) - 1} messages", delete_after=3)
 
     @clean.command(name="user")
     async def clean_user_messages(self, ctx, user: discord.Member, amount: int = 100):
@@ -431,16 +428,8 @@ class Management(commands.Cog):
             
         deleted = await ctx.channel.purge(limit=amount, check=check)
         
-        msg = await ctx.send(f"✅ Deleted {len(deleted)} messages from {user.mention}")
-        await asyncio.sleep(3)
-        await msg.delete()
+        await ctx.send(f"✅ Deleted {len(deleted)} messages from {user.mention}", delete_after=3)
 
-    @clean.command(name="bots")
-    async def clean_bot_messages(self, ctx, amount: int = 100):
-        """Clean bot messages"""
-        if amount < 1:
-            return await ctx.send("❌ Amount must be positive!")
-            
     @clean.command(name="bots")
     async def clean_bot_messages(self, ctx, amount: int = 100):
         """Clean bot messages"""
@@ -452,9 +441,7 @@ class Management(commands.Cog):
             
         deleted = await ctx.channel.purge(limit=amount, check=check)
         
-        msg = await ctx.send(f"✅ Deleted {len(deleted)} bot messages")
-        await asyncio.sleep(3)
-        await msg.delete()
+        await ctx.send(f"✅ Deleted {len(deleted)} bot messages", delete_after=3)
 
     async def log_role_change(self, guild: discord.Guild, role: discord.Role, action: str):
         """Log role changes"""
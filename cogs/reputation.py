@@ -1,11 +1,12 @@
 import discord
 from discord.ext import commands
 import asyncio
+import time
 from asyncio import Lock
 import sqlite3
-from datetime import datetime, timedelta
+from datetime import datetime
 from typing import Optional, Dict, List
-from .utils import Embed, event_dispatcher
+from .utils import Embed, event_dispatcher, cooldown_cache
 from database import get_connection
 import logging
 
@@ -16,12 +17,11 @@ class Reputation(commands.Cog):
     
     def __init__(self, bot):
         self.bot = bot
-        self.cooldowns = {}
+        # guild-user -> cooldown deadline
+        self.cooldowns = cooldown_cache()
         # Initialize locks
-        self.db_lock = Lock()  # For database operations
         self.cooldown_lock = Lock()  # For cooldown management
         self.role_lock = Lock()  # For role updates
-        self.response_lock = Lock()  # For preventing multiple responses
         self.setup_tables()
         self.register_handlers()
 
@@ -38,17 +38,12 @@ class Reputation(commands.Cog):
             return False
 
     async def send_response_once(self, ctx, message, *, embed=None):
-        """Helper method to ensure only one response is sent"""
-        if not await self.acquire_lock(self.response_lock, timeout=5.0):
-            return
-        
-        try:
-            if embed:
-                await ctx.send(embed=embed)
-            else:
-                await ctx.send(message)
-        finally:
-            self.response_lock.release()
+        """Helper method to send either a plain message or an embed"""
+        # Each ctx gets its own reply, so there is nothing to serialize here
+        if embed:
+            await ctx.send(embed=embed)
+        else:
+            await ctx.send(message)
 
     def setup_tables(self):
         """Setup necessary database tables"""
@@ -132,47 +127,46 @@ class Reputation(commands.Cog):
 
     async def get_settings(self, guild_id: int) -> Dict:
         """Get reputation settings for a guild"""
-        async with self.db_lock:
-            conn = None
-            try:
-                conn = get_connection()
-                cursor = conn.cursor()
-                
+        conn = None
+        try:
+            conn = get_connection()
+            cursor = conn.cursor()
+
+            cursor.execute("""
+                SELECT * FROM reputation_settings WHERE guild_id = ?
+            """, (str(guild_id),))
+            data = cursor.fetchone()
+
+            if not data:
+                default_settings = {
+                    'cooldown': 43200,  # 12 hours in seconds
+                    'max_daily': 3,
+                    'min_message_age': 1800,  # 30 minutes in seconds
+                    'required_role': None,
+                    'blacklisted_roles': '',
+                    'log_channel': None,
+                    'auto_roles': '',
+                    'stack_roles': False,
+                    'decay_enabled': False,
+                    'decay_days': 30
+                }
+
                 cursor.execute("""
-                    SELECT * FROM reputation_settings WHERE guild_id = ?
-                """, (str(guild_id),))
-                data = cursor.fetchone()
-                
-                if not data:
-                    default_settings = {
-                        'cooldown': 43200,  # 12 hours in seconds
-                        'max_daily': 3,
-                        'min_message_age': 1800,  # 30 minutes in seconds
-                        'required_role': None,
-                        'blacklisted_roles': '',
-                        'log_channel': None,
-                        'auto_roles': '',
-                        'stack_roles': False,
-                        'decay_enabled': False,
-                        'decay_days': 30
-                    }
-                    
-                    cursor.execute("""
-                        INSERT INTO reputation_settings
-                        (guild_id, cooldown, max_daily)
-                        VALUES (?, ?, ?)
-                    """, (str(guild_id), 43200, 3))
-                    conn.commit()
-                    return default_settings
-                    
-                return dict(data)
-                
-            except sqlite3.Error as e:
-                logger.error(f"Failed to get reputation settings: {e}")
-                raise
-            finally:
-                if conn:
-                    conn.close()
+                    INSERT INTO reputation_settings
+                    (guild_id, cooldown, max_daily)
+                    VALUES (?, ?, ?)
+                """, (str(guild_id), 43200, 3))
+                conn.commit()
+                return default_settings
+
+            return dict(data)
+
+        except sqlite3.Error as e:
+            logger.error(f"Failed to get reputation settings: {e}")
+            raise
+        finally:
+            if conn:
+                conn.close()
 
     async def check_reputation_roles(self, member: discord.Member, reputation: int):
         """Check and update reputation roles"""
@@ -182,49 +176,48 @@ class Reputation(commands.Cog):
         try:
             settings = await self.get_settings(member.guild.id)
             
-            async with self.db_lock:
-                conn = None
+            conn = None
+            try:
+                conn = get_connection()
+                cursor = conn.cursor()
+
+                cursor.execute("""
+                    SELECT role_id, reputation FROM reputation_roles
+                    WHERE guild_id = ? AND reputation <= ?
+                    ORDER BY reputation DESC
+                """, (str(member.guild.id), reputation))
+                role_data = cursor.fetchall()
+
+                if not role_data:
+                    return
+
                 try:
-                    conn = get_connection()
-                    cursor = conn.cursor()
-                    
-                    cursor.execute("""
-                        SELECT role_id, reputation FROM reputation_roles
-                        WHERE guild_id = ? AND reputation <= ?
-                        ORDER BY reputation DESC
-                    """, (str(member.guild.id), reputation))
-                    role_data = cursor.fetchall()
-                    
-                    if not role_data:
-                        return
-                        
-                    try:
-                        if settings['stack_roles']:
-                            # Add all roles up to current reputation
-                            for data in role_data:
+                    if settings['stack_roles']:
+                        # Add all roles up to current reputation
+                        for data in role_data:
+                            role = member.guild.get_role(int(data['role_id']))
+                            if role and role not in member.roles:
+                                await member.add_roles(role)
+                    else:
+                        # Only add highest role
+                        highest_role = member.guild.get_role(int(role_data[0]['role_id']))
+                        if highest_role:
+                            # Remove other reputation roles
+                            for data in role_data[1:]:
                                 role = member.guild.get_role(int(data['role_id']))
-                                if role and role not in member.roles:
-                                    await member.add_roles(role)
-                        else:
-                            # Only add highest role
-                            highest_role = member.guild.get_role(int(role_data[0]['role_id']))
-                            if highest_role:
-                                # Remove other reputation roles
-                                for data in role_data[1:]:
-                                    role = member.guild.get_role(int(data['role_id']))
-                                    if role and role in member.roles:
-                                        await member.remove_roles(role)
-                                # Add highest role
-                                if highest_role not in member.roles:
-                                    await member.add_roles(highest_role)
-                    except discord.Forbidden:
-                        logger.error(f"Failed to update roles for {member.id}: Missing permissions")
-                        
-                except sqlite3.Error as e:
-                    logger.error(f"Failed to check reputation roles: {e}")
-                finally:
-                    if conn:
-                        conn.close()
+                                if role and role in member.roles:
+                                    await member.remove_roles(role)
+                            # Add highest role
+                            if highest_role not in member.roles:
+                                await member.add_roles(highest_role)
+                except discord.Forbidden:
+                    logger.error(f"Failed to update roles for {member.id}: Missing permissions")
+
+            except sqlite3.Error as e:
+                logger.error(f"Failed to check reputation roles: {e}")
+            finally:
+                if conn:
+                    conn.close()
         finally:
             self.role_lock.release()
 
@@ -232,28 +225,27 @@ class Reputation(commands.Cog):
                            receiver: discord.Member, action: str, amount: int, 
                            reason: str = None):
         """Log reputation changes"""
-        async with self.db_lock:
-            settings = await self.get_settings(guild.id)
-            if not settings['log_channel']:
-                return
-                
-            channel = guild.get_channel(int(settings['log_channel']))
-            if not channel:
-                return
-                
-            embed = Embed.create(
-                title="⭐ Reputation Update",
-                color=discord.Color.gold(),
-                field_Action=action,
-                field_From=f"{giver} ({giver.id})",
-                field_To=f"{receiver} ({receiver.id})",
-                field_Amount=str(amount)
-            )
-            
-            if reason:
-                embed.add_field(name="Reason", value=reason)
-                
-            await channel.send(embed=embed)
+        settings = await self.get_settings(guild.id)
+        if not settings['log_channel']:
+            return
+
+        channel = guild.get_channel(int(settings['log_channel']))
+        if not channel:
+            return
+
+        embed = Embed.create(
+            title="⭐ Reputation Update",
+            color=discord.Color.gold(),
+            field_Action=action,
+            field_From=f"{giver} ({giver.id})",
+            field_To=f"{receiver} ({receiver.id})",
+            field_Amount=str(amount)
+        )
+
+        if reason:
+            embed.add_field(name="Reason", value=reason)
+
+        await channel.send(embed=embed)
 
     @commands.group(name="rep")
     async def rep(self, ctx):
@@ -274,324 +266,320 @@ class Reputation(commands.Cog):
             return await self.send_response_once(ctx, "❌ System is busy, please try again later")
             
         try:
-            async with self.db_lock:
-                settings = await self.get_settings(ctx.guild.id)
-                
-                # Check required role
-                if settings['required_role']:
-                    required_role = ctx.guild.get_role(int(settings['required_role']))
-                    if required_role and required_role not in ctx.author.roles:
-                        return await self.send_response_once(
-                            ctx,
-                            f"❌ You need the {required_role.mention} role to give reputation!"
-                        )
-                
-                # Check blacklisted roles
-                if settings['blacklisted_roles']:
-                    blacklisted = settings['blacklisted_roles'].split(',')
-                    for role_id in blacklisted:
-                        role = ctx.guild.get_role(int(role_id))
-                        if role and role in member.roles:
-                            return await self.send_response_once(
-                                ctx,
-                                f"❌ Members with {role.mention} can't receive reputation!"
-                            )
-                
-                # Check cooldown
-                cooldown_key = f"{ctx.guild.id}-{ctx.author.id}"
-                if cooldown_key in self.cooldowns:
-                    remaining = self.cooldowns[cooldown_key] - datetime.utcnow()
-                    if remaining.total_seconds() > 0:
+            settings = await self.get_settings(ctx.guild.id)
+
+            # Check required role
+            if settings['required_role']:
+                required_role = ctx.guild.get_role(int(settings['required_role']))
+                if required_role and required_role not in ctx.author.roles:
+                    return await self.send_response_once(
+                        ctx,
+                        f"❌ You need the {required_role.mention} role to give reputation!"
+                    )
+
+            # Check blacklisted roles
+            if settings['blacklisted_roles']:
+                blacklisted = settings['blacklisted_roles'].split(',')
+                for role_id in blacklisted:
+                    role = ctx.guild.get_role(int(role_id))
+                    if role and role in member.roles:
                         return await self.send_response_once(
                             ctx,
-                            f"❌ You must wait {int(remaining.total_seconds() // 60)} minutes before giving reputation again!"
+                            f"❌ Members with {role.mention} can't receive reputation!"
                         )
-                
-                conn = None
-                try:
-                    conn = get_connection()
-                    cursor = conn.cursor()
-                    
-                    # Check daily limit
-                    cursor.execute("""
-                        SELECT COUNT(*) as count FROM reputation_history
-                        WHERE guild_id = ? AND giver_id = ? 
-                        AND timestamp > datetime('now', '-1 day')
-                    """, (str(ctx.guild.id), str(ctx.author.id)))
-                    data = cursor.fetchone()
-                    
-                    if data['count'] >= settings['max_daily']:
-                        return await self.send_response_once(ctx, "❌ You've reached your daily reputation limit!")
-                    
-                    # Update reputation
-                    cursor.execute("""
-                        INSERT INTO user_reputation (user_id, guild_id, reputation, total_received)
-                        VALUES (?, ?, 1, 1)
-                        ON CONFLICT(user_id, guild_id) DO UPDATE SET
-                        reputation = reputation + 1,
-                        total_received = total_received + 1,
-                        last_received = CURRENT_TIMESTAMP
-                    """, (str(member.id), str(ctx.guild.id)))
-                    
-                    # Update giver stats
-                    cursor.execute("""
-                        INSERT INTO user_reputation (user_id, guild_id, total_given)
-                        VALUES (?, ?, 1)
-                        ON CONFLICT(user_id, guild_id) DO UPDATE SET
-                        total_given = total_given + 1,
-                        last_given = CURRENT_TIMESTAMP
-                    """, (str(ctx.author.id), str(ctx.guild.id)))
-                    
-                    # Record history
-                    cursor.execute("""
-                        INSERT INTO reputation_history
-                        (guild_id, giver_id, receiver_id, message_id, reason, amount)
-                        VALUES (?, ?, ?, ?, ?, 1)
-                    """, (
-                        str(ctx.guild.id),
-                        str(ctx.author.id),
-                        str(member.id),
-                        str(ctx.message.id),
-                        reason
-                    ))
-                    
-                    conn.commit()
-                    
-                    # Set cooldown
-                    self.cooldowns[cooldown_key] = datetime.utcnow() + timedelta(seconds=settings['cooldown'])
-                    
-                    # Get new reputation
-                    cursor.execute("""
-                        SELECT reputation FROM user_reputation
-                        WHERE user_id = ? AND guild_id = ?
-                    """, (str(member.id), str(ctx.guild.id)))
-                    data = cursor.fetchone()
-                    new_rep = data['reputation']
-                    
-                    await self.check_reputation_roles(member, new_rep)
-                    await self.log_reputation(ctx.guild, ctx.author, member, "Give", 1, reason)
-                    await self.send_response_once(
+
+            # Check cooldown
+            cooldown_key = f"{ctx.guild.id}-{ctx.author.id}"
+            deadline = self.cooldowns.get(cooldown_key)
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining > 0:
+                    return await self.send_response_once(
                         ctx,
-                        f"✅ Gave reputation to {member.mention}! Their new reputation is {new_rep} ⭐"
+                        f"❌ You must wait {int(remaining // 60)} minutes before giving reputation again!"
                     )
-                    
-                except sqlite3.Error as e:
-                    logger.error(f"Failed to give reputation: {e}")
-                    await self.send_response_once(ctx, "❌ An error occurred while giving reputation")
-                    if conn:
-                        conn.rollback()
-                finally:
-                    if conn:
-                        conn.close()
-        finally:
-            self.cooldown_lock.release()
 
-    @rep.command(name="remove", aliases=["-"])
-    @commands.has_permissions(manage_guild=True)
-    async def remove_rep(self, ctx, member: discord.Member, amount: int = 1, *, reason: str = None):
-        """Remove reputation from a member"""
-        if amount < 1:
-            return await self.send_response_once(ctx, "❌ Amount must be positive!")
-            
-        async with self.db_lock:
             conn = None
             try:
                 conn = get_connection()
                 cursor = conn.cursor()
-                
+
+                # Check daily limit
                 cursor.execute("""
-                    UPDATE user_reputation
-                    SET reputation = MAX(0, reputation - ?)
-                    WHERE user_id = ? AND guild_id = ?
-                """, (amount, str(member.id), str(ctx.guild.id)))
-                
+                    SELECT COUNT(*) as count FROM reputation_history
+                    WHERE guild_id = ? AND giver_id = ? 
+                    AND timestamp > datetime('now', '-1 day')
+                """, (str(ctx.guild.id), str(ctx.author.id)))
+                data = cursor.fetchone()
+
+                if data['count'] >= settings['max_daily']:
+                    return await self.send_response_once(ctx, "❌ You've reached your daily reputation limit!")
+
+                # Update reputation
+                cursor.execute("""
+                    INSERT INTO user_reputation (user_id, guild_id, reputation, total_received)
+                    VALUES (?, ?, 1, 1)
+                    ON CONFLICT(user_id, guild_id) DO UPDATE SET
+                    reputation = reputation + 1,
+                    total_received = total_received + 1,
+                    last_received = CURRENT_TIMESTAMP
+                """, (str(member.id), str(ctx.guild.id)))
+
+                # Update giver stats
+                cursor.execute("""
+                    INSERT INTO user_reputation (user_id, guild_id, total_given)
+                    VALUES (?, ?, 1)
+                    ON CONFLICT(user_id, guild_id) DO UPDATE SET
+                    total_given = total_given + 1,
+                    last_given = CURRENT_TIMESTAMP
+                """, (str(ctx.author.id), str(ctx.guild.id)))
+
                 # Record history
                 cursor.execute("""
                     INSERT INTO reputation_history
-                    (guild_id, giver_id, receiver_id, reason, amount)
-                    VALUES (?, ?, ?, ?, ?)
+                    (guild_id, giver_id, receiver_id, message_id, reason, amount)
+                    VALUES (?, ?, ?, ?, ?, 1)
                 """, (
                     str(ctx.guild.id),
                     str(ctx.author.id),
                     str(member.id),
-                    reason,
-                    -amount
+                    str(ctx.message.id),
+                    reason
                 ))
-                
+
                 conn.commit()
-                
+
+                # Set cooldown
+                self.cooldowns[cooldown_key] = time.monotonic() + settings['cooldown']
+
                 # Get new reputation
                 cursor.execute("""
                     SELECT reputation FROM user_reputation
                     WHERE user_id = ? AND guild_id = ?
                 """, (str(member.id), str(ctx.guild.id)))
                 data = cursor.fetchone()
-                new_rep = data['reputation'] if data else 0
-                
+                new_rep = data['reputation']
+
                 await self.check_reputation_roles(member, new_rep)
-                await self.log_reputation(ctx.guild, ctx.author, member, "Remove", amount, reason)
+                await self.log_reputation(ctx.guild, ctx.author, member, "Give", 1, reason)
                 await self.send_response_once(
                     ctx,
-                    f"✅ Removed {amount} reputation from {member.mention}! Their new reputation is {new_rep} ⭐"
+                    f"✅ Gave reputation to {member.mention}! Their new reputation is {new_rep} ⭐"
                 )
-                
+
             except sqlite3.Error as e:
-                logger.error(f"Failed to remove reputation: {e}")
-                await self.send_response_once(ctx, "❌ An error occurred while removing reputation")
+                logger.error(f"Failed to give reputation: {e}")
+                await self.send_response_once(ctx, "❌ An error occurred while giving reputation")
                 if conn:
                     conn.rollback()
             finally:
                 if conn:
                     conn.close()
+        finally:
+            self.cooldown_lock.release()
+
+    @rep.command(name="remove", aliases=["-"])
+    @commands.has_permissions(manage_guild=True)
+    async def remove_rep(self, ctx, member: discord.Member, amount: int = 1, *, reason: str = None):
+        """Remove reputation from a member"""
+        if amount < 1:
+            return await self.send_response_once(ctx, "❌ Amount must be positive!")
+            
+        conn = None
+        try:
+            conn = get_connection()
+            cursor = conn.cursor()
+
+            cursor.execute("""
+                UPDATE user_reputation
+                SET reputation = MAX(0, reputation - ?)
+                WHERE user_id = ? AND guild_id = ?
+            """, (amount, str(member.id), str(ctx.guild.id)))
+
+            # Record history
+            cursor.execute("""
+                INSERT INTO reputation_history
+                (guild_id, giver_id, receiver_id, reason, amount)
+                VALUES (?, ?, ?, ?, ?)
+            """, (
+                str(ctx.guild.id),
+                str(ctx.author.id),
+                str(member.id),
+                reason,
+                -amount
+            ))
+
+            conn.commit()
+
+            # Get new reputation
+            cursor.execute("""
+                SELECT reputation FROM user_reputation
+                WHERE user_id = ? AND guild_id = ?
+            """, (str(member.id), str(ctx.guild.id)))
+            data = cursor.fetchone()
+            new_rep = data['reputation'] if data else 0
+
+            await self.check_reputation_roles(member, new_rep)
+            await self.log_reputation(ctx.guild, ctx.author, member, "Remove", amount, reason)
+            await self.send_response_once(
+                ctx,
+                f"✅ Removed {amount} reputation from {member.mention}! Their new reputation is {new_rep} ⭐"
+            )
+
+        except sqlite3.Error as e:
+            logger.error(f"Failed to remove reputation: {e}")
+            await self.send_response_once(ctx, "❌ An error occurred while removing reputation")
+            if conn:
+                conn.rollback()
+        finally:
+            if conn:
+                conn.close()
 
     @rep.command(name="check")
     async def check_rep(self, ctx, member: discord.Member = None):
         """Check your or someone else's reputation"""
         member = member or ctx.author
         
-        async with self.db_lock:
-            conn = None
-            try:
-                conn = get_connection()
-                cursor = conn.cursor()
-                
-                cursor.execute("""
-                    SELECT * FROM user_reputation
-                    WHERE user_id = ? AND guild_id = ?
-                """, (str(member.id), str(ctx.guild.id)))
-                data = cursor.fetchone()
-                
-                if not data:
-                    return await self.send_response_once(ctx, "❌ This user has no reputation yet!")
-                    
-                # Get rank
-                cursor.execute("""
-                    SELECT COUNT(*) as rank
-                    FROM user_reputation
-                    WHERE guild_id = ? AND reputation > ?
-                """, (str(ctx.guild.id), data['reputation']))
-                rank_data = cursor.fetchone()
-                
-                rank = rank_data['rank'] + 1
-                
-                embed = Embed.create(
-                    title=f"⭐ Reputation - {member.display_name}",
-                    color=member.color,
-                    field_Reputation=str(data['reputation']),
-                    field_Rank=f"#{rank}",
-                    field_Given=str(data['total_given']),
-                    field_Received=str(data['total_received'])
+        conn = None
+        try:
+            conn = get_connection()
+            cursor = conn.cursor()
+
+            cursor.execute("""
+                SELECT * FROM user_reputation
+                WHERE user_id = ? AND guild_id = ?
+            """, (str(member.id), str(ctx.guild.id)))
+            data = cursor.fetchone()
+
+            if not data:
+                return await self.send_response_once(ctx, "❌ This user has no reputation yet!")
+
+            # Get rank
+            cursor.execute("""
+                SELECT COUNT(*) as rank
+                FROM user_reputation
+                WHERE guild_id = ? AND reputation > ?
+            """, (str(ctx.guild.id), data['reputation']))
+            rank_data = cursor.fetchone()
+
+            rank = rank_data['rank'] + 1
+
+            embed = Embed.create(
+                title=f"⭐ Reputation - {member.display_name}",
+                color=member.color,
+                field_Reputation=str(data['reputation']),
+                field_Rank=f"#{rank}",
+                field_Given=str(data['total_given']),
+                field_Received=str(data['total_received'])
+            )
+
+            if data['last_received']:
+                embed.add_field(
+                    name="Last Received",
+                    value=f"<t:{int(datetime.strptime(data['last_received'], '%Y-%m-%d %H:%M:%S').timestamp())}:R>"
                 )
-                
-                if data['last_received']:
-                    embed.add_field(
-                        name="Last Received",
-                        value=f"<t:{int(datetime.strptime(data['last_received'], '%Y-%m-%d %H:%M:%S').timestamp())}:R>"
-                    )
-                    
-                await self.send_response_once(ctx, embed=embed)
-                
-            except sqlite3.Error as e:
-                logger.error(f"Failed to check reputation: {e}")
-                await self.send_response_once(ctx, "❌ An error occurred while checking reputation")
-            finally:
-                if conn:
-                    conn.close()
+
+            await self.send_response_once(ctx, embed=embed)
+
+        except sqlite3.Error as e:
+            logger.error(f"Failed to check reputation: {e}")
+            await self.send_response_once(ctx, "❌ An error occurred while checking reputation")
+        finally:
+            if conn:
+                conn.close()
 
     @rep.command(name="top")
     async def top_rep(self, ctx):
         """Show reputation leaderboard"""
-        async with self.db_lock:
-            conn = None
-            try:
-                conn = get_connection()
-                cursor = conn.cursor()
-                
-                cursor.execute("""
-                    SELECT user_id, reputation
-                    FROM user_reputation
-                    WHERE guild_id = ?
-                    ORDER BY reputation DESC
-                    LIMIT 10
-                """, (str(ctx.guild.id),))
-                top_users = cursor.fetchall()
-                
-                if not top_users:
-                    return await self.send_response_once(ctx, "❌ No one has any reputation yet!")
-                    
-                embed = Embed.create(
-                    title=f"⭐ {ctx.guild.name}'s Top Members",
-                    color=discord.Color.gold()
-                )
-                
-                for idx, user_data in enumerate(top_users, 1):
-                    member = ctx.guild.get_member(int(user_data['user_id']))
-                    if member:
-                        embed.add_field(
-                            name=f"#{idx} {member.display_name}",
-                            value=f"{user_data['reputation']} ⭐",
-                            inline=False
-                        )
-                        
-                await self.send_response_once(ctx, embed=embed)
-                
-            except sqlite3.Error as e:
-                logger.error(f"Failed to get reputation leaderboard: {e}")
-                await self.send_response_once(ctx, "❌ An error occurred while getting the leaderboard")
-            finally:
-                if conn:
-                    conn.close()
+        conn = None
+        try:
+            conn = get_connection()
+            cursor = conn.cursor()
+
+            cursor.execute("""
+                SELECT user_id, reputation
+                FROM user_reputation
+                WHERE guild_id = ?
+                ORDER BY reputation DESC
+                LIMIT 10
+            """, (str(ctx.guild.id),))
+            top_users = cursor.fetchall()
+
+            if not top_users:
+                return await self.send_response_once(ctx, "❌ No one has any reputation yet!")
+
+            embed = Embed.create(
+                title=f"⭐ {ctx.guild.name}'s Top Members",
+                color=discord.Color.gold()
+            )
+
+            for idx, user_data in enumerate(top_users, 1):
+                member = ctx.guild.get_member(int(user_data['user_id']))
+                if member:
+                    embed.add_field(
+                        name=f"#{idx} {member.display_name}",
+                        value=f"{user_data['reputation']} ⭐",
+                        inline=False
+                    )
+
+            await self.send_response_once(ctx, embed=embed)
+
+        except sqlite3.Error as e:
+            logger.error(f"Failed to get reputation leaderboard: {e}")
+            await self.send_response_once(ctx, "❌ An error occurred while getting the leaderboard")
+        finally:
+            if conn:
+                conn.close()
 
     @rep.command(name="history")
     async def rep_history(self, ctx, member: discord.Member = None):
         """View reputation history"""
         member = member or ctx.author
         
-        async with self.db_lock:
-            conn = None
-            try:
-                conn = get_connection()
-                cursor = conn.cursor()
-                
-                cursor.execute("""
-                    SELECT * FROM reputation_history
-                    WHERE (giver_id = ? OR receiver_id = ?) AND guild_id = ?
-                    ORDER BY timestamp DESC LIMIT 10
-                """, (str(member.id), str(member.id), str(ctx.guild.id)))
-                history = cursor.fetchall()
-                
-                if not history:
-                    return await self.send_response_once(ctx, "❌ No reputation history found!")
-                    
-                embed = Embed.create(
-                    title=f"⭐ Reputation History - {member.display_name}",
-                    color=member.color
-                )
-                
-                for entry in history:
-                    giver = ctx.guild.get_member(int(entry['giver_id']))
-                    receiver = ctx.guild.get_member(int(entry['receiver_id']))
-                    
-                    if giver and receiver:
-                        timestamp = datetime.strptime(entry['timestamp'], '%Y-%m-%d %H:%M:%S')
-                        action = "Received" if entry['receiver_id'] == str(member.id) else "Gave"
-                        target = giver if action == "Received" else receiver
-                        
-                        embed.add_field(
-                            name=f"{action} {abs(entry['amount'])} ⭐ {discord.utils.format_dt(timestamp, 'R')}",
-                            value=f"{'From' if action == 'Received' else 'To'}: {target.mention}\n"
-                                  f"Reason: {entry['reason'] or 'No reason provided'}",
-                            inline=False
-                        )
-                        
-                await self.send_response_once(ctx, embed=embed)
-                
-            except sqlite3.Error as e:
-                logger.error(f"Failed to get reputation history: {e}")
-                await self.send_response_once(ctx, "❌ An error occurred while getting the history")
-            finally:
-                if conn:
-                    conn.close()
+        conn = None
+        try:
+            conn = get_connection()
+            cursor = conn.cursor()
+
+            cursor.execute("""
+                SELECT * FROM reputation_history
+                WHERE (giver_id = ? OR receiver_id = ?) AND guild_id = ?
+                ORDER BY timestamp DESC LIMIT 10
+            """, (str(member.id), str(member.id), str(ctx.guild.id)))
+            history = cursor.fetchall()
+
+            if not history:
+                return await self.send_response_once(ctx, "❌ No reputation history found!")
+
+            embed = Embed.create(
+                title=f"⭐ Reputation History - {member.display_name}",
+                color=member.color
+            )
+
+            for entry in history:
+                giver = ctx.guild.get_member(int(entry['giver_id']))
+                receiver = ctx.guild.get_member(int(entry['receiver_id']))
+
+                if giver and receiver:
+                    timestamp = datetime.strptime(entry['timestamp'], '%Y-%m-%d %H:%M:%S')
+                    action = "Received" if entry['receiver_id'] == str(member.id) else "Gave"
+                    target = giver if action == "Received" else receiver
+
+                    embed.add_field(
+                        name=f"{action} {abs(entry['amount'])} ⭐ {discord.utils.format_dt(timestamp, 'R')}",
+                        value=f"{'From' if action == 'Received' else 'To'}: {target.mention}\n"
+                              f"Reason: {entry['reason'] or 'No reason provided'}",
+                        inline=False
+                    )
+
+            await self.send_response_once(ctx, embed=embed)
+
+        except sqlite3.Error as e:
+            logger.error(f"Failed to get reputation history: {e}")
+            await self.send_response_once(ctx, "❌ An error occurred while getting the history")
+        finally:
+            if conn:
+                conn.close()
 
     @commands.group(name="repset")
     @commands.has_permissions(manage_guild=True)
@@ -621,29 +609,28 @@ class Reputation(commands.Cog):
         if hours < 1:
             return await self.send_response_once(ctx, "❌ Cooldown must be at least 1 hour!")
             
-        async with self.db_lock:
-            conn = None
-            try:
-                conn = get_connection()
-                cursor = conn.cursor()
-                
-                cursor.execute("""
-                    UPDATE reputation_settings
-                    SET cooldown = ?
-                    WHERE guild_id = ?
-                """, (hours * 3600, str(ctx.guild.id)))
-                conn.commit()
-                
-                await self.send_response_once(ctx, f"✅ Reputation cooldown set to {hours} hours")
-                
-            except sqlite3.Error as e:
-                logger.error(f"Failed to set cooldown: {e}")
-                await self.send_response_once(ctx, "❌ An error occurred while setting the cooldown")
-                if conn:
-                    conn.rollback()
-            finally:
-                if conn:
-                    conn.close()
+        conn = None
+        try:
+            conn = get_connection()
+            cursor = conn.cursor()
+
+            cursor.execute("""
+                UPDATE reputation_settings
+                SET cooldown = ?
+                WHERE guild_id = ?
+            """, (hours * 3600, str(ctx.guild.id)))
+            conn.commit()
+
+            await self.send_response_once(ctx, f"✅ Reputation cooldown set to {hours} hours")
+
+        except sqlite3.Error as e:
+            logger.error(f"Failed to set cooldown: {e}")
+            await self.send_response_once(ctx, "❌ An error occurred while setting the cooldown")
+            if conn:
+                conn.rollback()
+        finally:
+            if conn:
+                conn.close()
 
     @repset.command(name="maxdaily")
     async def set_max_daily(self, ctx, amount: int):
@@ -651,29 +638,28 @@ class Reputation(commands.Cog):
         if amount < 1:
             return await self.send_response_once(ctx, "❌ Amount must be positive!")
             
-        async with self.db_lock:
-            conn = None
-            try:
-                conn = get_connection()
-                cursor = conn.cursor()
-                
-                cursor.execute("""
-                    UPDATE reputation_settings
-                    SET max_daily = ?
-                    WHERE guild_id = ?
-                """, (amount, str(ctx.guild.id)))
-                conn.commit()
-                
-                await self.send_response_once(ctx, f"✅ Maximum daily reputation gives set to {amount}")
-                
-            except sqlite3.Error as e:
-                logger.error(f"Failed to set max daily: {e}")
-                await self.send_response_once(ctx, "❌ An error occurred while setting the daily limit")
-                if conn:
-                    conn.rollback()
-            finally:
-                if conn:
-                    conn.close()
+        conn = None
+        try:
+            conn = get_connection()
+            cursor = conn.cursor()
+
+            cursor.execute("""
+                UPDATE reputation_settings
+                SET max_daily = ?
+                WHERE guild_id = ?
+            """, (amount, str(ctx.guild.id)))
+            conn.commit()
+
+            await self.send_response_once(ctx, f"✅ Maximum daily reputation gives set to {amount}")
+
+        except sqlite3.Error as e:
+            logger.error(f"Failed to set max daily: {e}")
+            await self.send_response_once(ctx, "❌ An error occurred while setting the daily limit")
+            if conn:
+                conn.rollback()
+        finally:
+            if conn:
+                conn.close()
 
     @repset.command(name="addrole")
     async def add_rep_role(self, ctx, role: discord.Role, required_rep: int):
@@ -681,89 +667,86 @@ class Reputation(commands.Cog):
         if required_rep < 0:
             return await self.send_response_once(ctx, "❌ Required reputation must be positive!")
             
-        async with self.db_lock:
-            conn = None
-            try:
-                conn = get_connection()
-                cursor = conn.cursor()
-                
-                cursor.execute("""
-                    INSERT OR REPLACE INTO reputation_roles
-                    (guild_id, reputation, role_id)
-                    VALUES (?, ?, ?)
-                """, (str(ctx.guild.id), required_rep, str(role.id)))
-                conn.commit()
-                
-                await self.send_response_once(ctx, f"✅ {role.mention} will be given at {required_rep} reputation")
-                
-            except sqlite3.Error as e:
-                logger.error(f"Failed to add reputation role: {e}")
-                await self.send_response_once(ctx, "❌ An error occurred while adding the role")
-                if conn:
-                    conn.rollback()
-            finally:
-                if conn:
-                    conn.close()
+        conn = None
+        try:
+            conn = get_connection()
+            cursor = conn.cursor()
+
+            cursor.execute("""
+                INSERT OR REPLACE INTO reputation_roles
+                (guild_id, reputation, role_id)
+                VALUES (?, ?, ?)
+            """, (str(ctx.guild.id), required_rep, str(role.id)))
+            conn.commit()
+
+            await self.send_response_once(ctx, f"✅ {role.mention} will be given at {required_rep} reputation")
+
+        except sqlite3.Error as e:
+            logger.error(f"Failed to add reputation role: {e}")
+            await self.send_response_once(ctx, "❌ An error occurred while adding the role")
+            if conn:
+                conn.rollback()
+        finally:
+            if conn:
+                conn.close()
 
     @repset.command(name="removerole")
     async def remove_rep_role(self, ctx, role: discord.Role):
         """Remove a reputation role reward"""
-        async with self.db_lock:
-            conn = None
-            try:
-                conn = get_connection()
-                cursor = conn.cursor()
-                
-                cursor.execute("""
-                    DELETE FROM reputation_roles
-                    WHERE guild_id = ? AND role_id = ?
-                """, (str(ctx.guild.id), str(role.id)))
-                conn.commit()
-                
-                await self.send_response_once(ctx, f"✅ Removed {role.mention} from reputation rewards")
-                
-            except sqlite3.Error as e:
-                logger.error(f"Failed to remove reputation role: {e}")
-                await self.send_response_once(ctx, "❌ An error occurred while removing the role")
-                if conn:
-                    conn.rollback()
-            finally:
-                if conn:
-                    conn.close()
+        conn = None
+        try:
+            conn = get_connection()
+            cursor = conn.cursor()
+
+            cursor.execute("""
+                DELETE FROM reputation_roles
+                WHERE guild_id = ? AND role_id = ?
+            """, (str(ctx.guild.id), str(role.id)))
+            conn.commit()
+
+            await self.send_response_once(ctx, f"✅ Removed {role.mention} from reputation rewards")
+
+        except sqlite3.Error as e:
+            logger.error(f"Failed to remove reputation role: {e}")
+            await self.send_response_once(ctx, "❌ An error occurred while removing the role")
+            if conn:
+                conn.rollback()
+        finally:
+            if conn:
+                conn.close()
 
     @repset.command(name="stackroles")
     async def toggle_stack_roles(self, ctx):
         """Toggle stacking of reputation roles"""
-        async with self.db_lock:
-            conn = None
-            try:
-                conn = get_connection()
-                cursor = conn.cursor()
-                
-                cursor.execute("""
-                    UPDATE reputation_settings
-                    SET stack_roles = NOT stack_roles
-                    WHERE guild_id = ?
-                """, (str(ctx.guild.id),))
-                conn.commit()
-                
-                cursor.execute("""
-                    SELECT stack_roles FROM reputation_settings
-                    WHERE guild_id = ?
-                """, (str(ctx.guild.id),))
-                data = cursor.fetchone()
-                
-                enabled = data['stack_roles']
-                await self.send_response_once(ctx, f"✅ Role stacking {'enabled' if enabled else 'disabled'}")
-                
-            except sqlite3.Error as e:
-                logger.error(f"Failed to toggle role stacking: {e}")
-                await self.send_response_once(ctx, "❌ An error occurred while toggling role stacking")
-                if conn:
-                    conn.rollback()
-            finally:
-                if conn:
-                    conn.close()
+        conn = None
+        try:
+            conn = get_connection()
+            cursor = conn.cursor()
+
+            cursor.execute("""
+                UPDATE reputation_settings
+                SET stack_roles = NOT stack_roles
+                WHERE guild_id = ?
+            """, (str(ctx.guild.id),))
+            conn.commit()
+
+            cursor.execute("""
+                SELECT stack_roles FROM reputation_settings
+                WHERE guild_id = ?
+            """, (str(ctx.guild.id),))
+            data = cursor.fetchone()
+
+            enabled = data['stack_roles']
+            await self.send_response_once(ctx, f"✅ Role stacking {'enabled' if enabled else 'disabled'}")
+
+        except sqlite3.Error as e:
+            logger.error(f"Failed to toggle role stacking: {e}")
+            await self.send_response_once(ctx, "❌ An error occurred while toggling role stacking")
+            if conn:
+                conn.rollback()
+        finally:
+            if conn:
+                conn.close()
 
 async def setup(bot):
     """Setup the Reputation cog"""
@@ -617,7 +617,7 @@ class TicketSystem(commands.Cog):
         embed = discord.Embed(
             title="🎫 Ticket System Settings",
             color=discord.Color.blue(),
-            timestamp=datetime.utcnow()
+            timestamp=discord.utils.utcnow()
         )
         
         # Format settings for display
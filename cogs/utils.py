@@ -1,14 +1,16 @@
 import discord
 from discord.ext import commands
-from datetime import datetime
 from typing import Optional, Union, Dict, Any, Callable, List
 import logging
 import sys
+import time
 from pathlib import Path
+from cachetools import TLRUCache
 
 # Add parent directory to path to import database
 sys.path.append(str(Path(__file__).parent.parent))
 from database import get_connection
+from ext.base_handler import MAX_TRACKED_USERS
 
 # Configure logger
 logger = logging.getLogger(__name__)
@@ -110,7 +112,7 @@ class Embed:
             title=title,
             description=description,
             color=color,
-            timestamp=datetime.utcnow()
+            timestamp=discord.utils.utcnow()
         )
         
         for key, value in kwargs.items():
@@ -127,6 +129,14 @@ class Embed:
                     
         return embed
 
+def cooldown_cache(maxsize: int = MAX_TRACKED_USERS) -> TLRUCache:
+    """Cache key -> monotonic deadline; entries drop out once the deadline passes"""
+    return TLRUCache(
+        maxsize=maxsize,
+        ttu=lambda _key, deadline, _now: deadline,
+        timer=time.monotonic
+    )
+
 def execute_query(query: str, params: tuple = (), fetch: bool = False):
     """Execute a database query with proper connection management"""
     conn = None
@@ -2,6 +2,10 @@ import sqlite3
 import logging
 import time
 import os
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
 from datetime import datetime
 from typing import Optional
 from pathlib import Path
@@ -9,6 +13,18 @@ from pathlib import Path
 # Configure logging
 logger = logging.getLogger(__name__)
 
+POOL_SIZE = 4
+
+def _configure_connection(conn: sqlite3.Connection) -> None:
+    """Apply the pragmas every connection is expected to run with"""
+    cursor = conn.cursor()
+    cursor.execute("PRAGMA foreign_keys = ON")
+    cursor.execute("PRAGMA journal_mode = WAL")     # Readers don't block on writers
+    cursor.execute("PRAGMA busy_timeout = 60000")   # 60 second timeout
+    cursor.execute("PRAGMA synchronous = NORMAL")   # Balance performance and safety
+    cursor.execute("PRAGMA cache_size = -20000")    # ~20MB page cache per connection
+    cursor.execute("PRAGMA temp_store = MEMORY")    # Store temp tables in memory
+
 def get_connection(max_retries: int = 3, timeout: int = 5) -> sqlite3.Connection:
     """
     Get SQLite database connection with retry mechanism
@@ -37,12 +53,7 @@ def get_connection(max_retries: int = 3, timeout: int = 5) -> sqlite3.Connection
             conn.row_factory = sqlite3.Row
             
             # Configure database settings
-            cursor = conn.cursor()
-            cursor.execute("PRAGMA foreign_keys = ON")
-            cursor.execute("PRAGMA journal_mode = DELETE")  # More stable than WAL
-            cursor.execute("PRAGMA busy_timeout = 60000")   # 60 second timeout
-            cursor.execute("PRAGMA synchronous = NORMAL")   # Balance performance and safety
-            cursor.execute("PRAGMA temp_store = MEMORY")    # Store temp tables in memory
+            _configure_connection(conn)
             
             return conn
         except sqlite3.Error as e:
@@ -52,6 +63,156 @@ def get_connection(max_retries: int = 3, timeout: int = 5) -> sqlite3.Connection
             logger.warning(f"Database connection attempt {attempt + 1} failed, retrying... Error: {e}")
             time.sleep(0.1 * (attempt + 1))
 
+# Discord snowflakes are stored as INTEGER so lookups compare numbers, not text
+USER_GROWID_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS {table} (
+        discord_id INTEGER PRIMARY KEY,
+        growid TEXT NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (growid) REFERENCES users(growid) ON DELETE CASCADE
+    )
+"""
+
+WARNINGS_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS {table} (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER NOT NULL,
+        guild_id INTEGER NOT NULL,
+        warning_type TEXT NOT NULL,
+        reason TEXT,
+        timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+    )
+"""
+
+# table -> (schema, Discord ID columns, column list, SELECT list casting the IDs)
+INTEGER_ID_MIGRATIONS = {
+    'user_growid': (
+        USER_GROWID_SCHEMA,
+        ('discord_id',),
+        "discord_id, growid, created_at",
+        "CAST(discord_id AS INTEGER), growid, created_at"
+    ),
+    'warnings': (
+        WARNINGS_SCHEMA,
+        ('user_id', 'guild_id'),
+        "id, user_id, guild_id, warning_type, reason, timestamp",
+        "id, CAST(user_id AS INTEGER), CAST(guild_id AS INTEGER), warning_type, reason, timestamp"
+    ),
+}
+
+def migrate_integer_ids(conn: sqlite3.Connection) -> None:
+    """Rebuild tables created before Discord IDs were stored as INTEGER"""
+    for table, (schema, id_columns, columns, select) in INTEGER_ID_MIGRATIONS.items():
+        column_types = {
+            row['name']: row['type'].upper()
+            for row in conn.execute(f"PRAGMA table_info({table})")
+        }
+        if not column_types or all(column_types.get(c) == 'INTEGER' for c in id_columns):
+            continue
+
+        logger.info(f"Migrating {table} Discord IDs to INTEGER")
+        conn.execute("PRAGMA foreign_keys = OFF")
+        try:
+            with conn:
+                conn.execute(schema.format(table=f"{table}_new"))
+                conn.execute(f"INSERT INTO {table}_new ({columns}) SELECT {select} FROM {table}")
+                conn.execute(f"DROP TABLE {table}")
+                conn.execute(f"ALTER TABLE {table}_new RENAME TO {table}")
+        finally:
+            conn.execute("PRAGMA foreign_keys = ON")
+
+class ConnectionPool:
+    """Pool of long-lived SQLite connections shared by the async services"""
+
+    def __init__(self, size: int = POOL_SIZE, timeout: int = 5):
+        self.size = size
+        self.timeout = timeout
+        self._pool: Optional[asyncio.Queue] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._closed = False
+
+    def _open(self) -> sqlite3.Connection:
+        conn = sqlite3.connect('shop.db', timeout=self.timeout, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        _configure_connection(conn)
+        return conn
+
+    @asynccontextmanager
+    async def acquire(self):
+        """
+        Borrow a connection from the pool
+        
+        Uncommitted work is rolled back when the connection is returned,
+        so callers must commit explicitly.
+        """
+        if self._closed:
+            raise RuntimeError("Connection pool is closed")
+        if self._pool is None:
+            self._pool = asyncio.Queue(maxsize=self.size)
+            for _ in range(self.size):
+                self._pool.put_nowait(self._open())
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.size,
+                thread_name_prefix="sqlite"
+            )
+
+        conn = await self._pool.get()
+        try:
+            yield conn
+        finally:
+            try:
+                if conn.in_transaction:
+                    conn.rollback()
+            except sqlite3.Error as e:
+                logger.warning(f"Replacing broken pooled connection: {e}")
+                conn.close()
+                conn = self._open()
+            self._pool.put_nowait(conn)
+
+    async def run(self, func, *args):
+        """
+        Run blocking `func(conn, *args)` on a pooled connection in a worker thread
+        
+        Keeps sqlite3 calls off the event loop. The connection is only
+        returned to the pool once the worker has finished with it, even
+        if the awaiting task is cancelled.
+        """
+        async with self.acquire() as conn:
+            loop = asyncio.get_running_loop()
+            future = loop.run_in_executor(self._executor, functools.partial(func, conn, *args))
+            try:
+                return await asyncio.shield(future)
+            finally:
+                if not future.done():
+                    await asyncio.wait({future})
+
+    async def close(self) -> None:
+        """
+        Close the pool once every borrowed connection has been returned
+        
+        Further acquire() calls raise instead of re-opening the pool.
+        """
+        self._closed = True
+        if self._pool is None:
+            return
+        for _ in range(self.size):
+            try:
+                conn = await asyncio.wait_for(self._pool.get(), timeout=self.timeout)
+            except asyncio.TimeoutError:
+                logger.error("Timed out waiting for pooled connections to be returned")
+                break
+            try:
+                conn.close()
+            except Exception as e:
+                logger.error(f"Error closing pooled connection: {e}")
+        # Every returned connection means its worker has finished, so the
+        # executor is idle and can be shut down without blocking the loop
+        self._executor.shutdown(wait=False)
+        self._executor = None
+        self._pool = None
+
+db_pool = ConnectionPool()
+
 def setup_database():
     """Initialize and setup all database tables"""
     conn = None
@@ -72,6 +233,7 @@ def setup_database():
                 logger.warning(f"Failed to create backup: {e}")
 
         conn = get_connection()
+        migrate_integer_ids(conn)
         cursor = conn.cursor()
 
         # Begin transaction
@@ -90,14 +252,7 @@ def setup_database():
                 )
             """)
 
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS user_growid (
-                    discord_id TEXT PRIMARY KEY,
-                    growid TEXT NOT NULL,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (growid) REFERENCES users(growid) ON DELETE CASCADE
-                )
-            """)
+            cursor.execute(USER_GROWID_SCHEMA.format(table='user_growid'))
 
             cursor.execute("""
                 CREATE TABLE IF NOT EXISTS products (
@@ -465,14 +620,14 @@ def setup_database():
                 )
             """)
 
+            cursor.execute(WARNINGS_SCHEMA.format(table='warnings'))
+
             cursor.execute("""
-                CREATE TABLE IF NOT EXISTS warnings (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    user_id TEXT NOT NULL,
-                    guild_id TEXT NOT NULL,
-                    warning_type TEXT NOT NULL,
-                    reason TEXT,
-                    timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+                CREATE TABLE IF NOT EXISTS scheduled_unmutes (
+                    user_id INTEGER NOT NULL,
+                    guild_id INTEGER NOT NULL,
+                    unmute_at REAL NOT NULL,
+                    PRIMARY KEY (user_id, guild_id)
                 )
             """)
 
@@ -588,6 +743,7 @@ def setup_database():
                 ("idx_warnings_user", "warnings(user_id)"),
                 ("idx_warnings_guild", "warnings(guild_id)"),
                 ("idx_automod_settings_guild", "automod_settings(guild_id)"),
+                ("idx_scheduled_unmutes_time", "scheduled_unmutes(unmute_at)"),
 
                 # Giveaway System Indexes
                 ("idx_giveaways_guild", "giveaways(guild_id)"),
@@ -679,7 +835,7 @@ def verify_database():
             'welcome_settings', 'welcome_logs',
             
             # AutoMod System Tables
-            'automod_settings', 'warnings',
+            'automod_settings', 'warnings', 'scheduled_unmutes',
             
             # Ticket System Tables
             'ticket_settings', 'tickets', 'ticket_responses',
@@ -1,5 +1,6 @@
 import logging
 import asyncio
+import sqlite3
 from typing import Dict, Optional
 from datetime import datetime
 
@@ -12,49 +13,48 @@ from .constants import (
     CURRENCY_RATES, # Untuk konversi mata uang
     CACHE_TIMEOUT  # Untuk cache timeout
 )
-from database import get_connection
+from database import db_pool
 from .base_handler import BaseLockHandler
 from .cache_manager import CacheManager
 
+BALANCE_UPDATE_RETRIES = 5
+# Short enough that the retry backoff below, not SQLite, does the waiting
+BALANCE_BUSY_TIMEOUT_MS = 100
+
 class BalanceManagerService(BaseLockHandler):
     _instance = None
-    _instance_lock = asyncio.Lock()
 
-    def __new__(cls, bot):
+    @classmethod
+    def get(cls, bot) -> 'BalanceManagerService':
+        """Return the shared instance, creating it on first use"""
         if cls._instance is None:
-            cls._instance = super().__new__(cls)
-            cls._instance.initialized = False
+            cls._instance = cls(bot)
         return cls._instance
 
     def __init__(self, bot):
-        if not self.initialized:
-            super().__init__()  # Initialize BaseLockHandler
-            self.bot = bot
-            self.logger = logging.getLogger("BalanceManagerService")
-            self.cache_manager = CacheManager()
-            self.initialized = True
+        super().__init__()  # Initialize BaseLockHandler
+        self.bot = bot
+        self.logger = logging.getLogger("BalanceManagerService")
+        self.cache_manager = CacheManager()
 
     async def get_growid(self, discord_id: str) -> Optional[str]:
-        """Get GrowID for Discord user with proper locking and caching"""
+        """Get GrowID for Discord user with caching"""
         cache_key = f"growid_{discord_id}"
         cached = await self.cache_manager.get(cache_key)
         if cached:
             return cached
 
-        lock = await self.acquire_lock(cache_key)
-        if not lock:
-            self.logger.warning(f"Failed to acquire lock for get_growid {discord_id}")
-            return None
-
+        # Read-only: writers use their own lock keys, so no lock is needed here
         try:
-            conn = get_connection()
-            cursor = conn.cursor()
-            
-            cursor.execute(
-                "SELECT growid FROM user_growid WHERE discord_id = ? COLLATE binary",
-                (str(discord_id),)
-            )
-            result = cursor.fetchone()
+            def query(conn):
+                cursor = conn.cursor()
+                cursor.execute(
+                    "SELECT growid FROM user_growid WHERE discord_id = ?",
+                    (int(discord_id),)
+                )
+                return cursor.fetchone()
+
+            result = await db_pool.run(query)
             
             if result:
                 growid = result['growid']
@@ -67,10 +67,6 @@ class BalanceManagerService(BaseLockHandler):
         except Exception as e:
             self.logger.error(f"Error getting GrowID: {e}")
             return None
-        finally:
-            if conn:
-                conn.close()
-            self.release_lock(cache_key)
 
     async def get_user_by_growid(self, growid: str) -> Optional[str]:
         """Get Discord ID by GrowID with caching"""
@@ -80,17 +76,18 @@ class BalanceManagerService(BaseLockHandler):
             return cached
 
         try:
-            conn = get_connection()
-            cursor = conn.cursor()
-            
-            cursor.execute(
-                "SELECT discord_id FROM user_growid WHERE growid = ? COLLATE binary",
-                (growid,)
-            )
-            result = cursor.fetchone()
+            def query(conn):
+                cursor = conn.cursor()
+                cursor.execute(
+                    "SELECT discord_id FROM user_growid WHERE growid = ? COLLATE binary",
+                    (growid,)
+                )
+                return cursor.fetchone()
+
+            result = await db_pool.run(query)
             
             if result:
-                discord_id = result['discord_id']
+                discord_id = str(result['discord_id'])
                 # Cache Discord ID for 1 hour
                 await self.cache_manager.set(cache_key, discord_id, expires_in=3600)
                 return discord_id
@@ -99,9 +96,6 @@ class BalanceManagerService(BaseLockHandler):
         except Exception as e:
             self.logger.error(f"Error getting Discord ID: {e}")
             return None
-        finally:
-            if conn:
-                conn.close()
 
     async def register_user(self, discord_id: str, growid: str) -> bool:
         """Register user with proper locking"""
@@ -109,36 +103,31 @@ class BalanceManagerService(BaseLockHandler):
         if not lock:
             raise TransactionError("System is busy, please try again later")
 
-        conn = None
         try:
-            conn = get_connection()
-            cursor = conn.cursor()
-            
-            # Check for existing GrowID (case-sensitive)
-            cursor.execute(
-                "SELECT growid FROM users WHERE growid = ? COLLATE binary",
-                (growid,)
-            )
-            existing = cursor.fetchone()
-            if existing and existing['growid'] != growid:
-                raise ValueError(f"GrowID already exists with different case: {existing['growid']}")
-            
-            # Begin transaction
-            conn.execute("BEGIN TRANSACTION")
-            
-            # Create user if not exists
-            cursor.execute(
-                "INSERT OR IGNORE INTO users (growid) VALUES (?)",
-                (growid,)
-            )
-            
-            # Link Discord ID to GrowID
-            cursor.execute(
-                "INSERT OR REPLACE INTO user_growid (discord_id, growid) VALUES (?, ?)",
-                (str(discord_id), growid)
-            )
-            
-            conn.commit()
+            def register(conn):
+                cursor = conn.cursor()
+                
+                # Begin transaction
+                conn.execute("BEGIN TRANSACTION")
+                
+                # Create user if not exists
+                cursor.execute(
+                    "INSERT INTO users (growid) VALUES (?) ON CONFLICT(growid) DO NOTHING",
+                    (growid,)
+                )
+                
+                # Link Discord ID to GrowID
+                cursor.execute(
+                    """
+                    INSERT INTO user_growid (discord_id, growid) VALUES (?, ?)
+                    ON CONFLICT(discord_id) DO UPDATE SET growid = excluded.growid
+                    """,
+                    (int(discord_id), growid)
+                )
+                
+                conn.commit()
+
+            await db_pool.run(register)
             
             # Update caches
             await self.cache_manager.set(f"growid_{discord_id}", growid, expires_in=3600)
@@ -150,16 +139,12 @@ class BalanceManagerService(BaseLockHandler):
 
         except Exception as e:
             self.logger.error(f"Error registering user: {e}")
-            if conn:
-                conn.rollback()
             raise
         finally:
-            if conn:
-                conn.close()
             self.release_lock(f"register_{discord_id}")
 
     async def get_balance(self, growid: str) -> Optional[Balance]:
-        """Get user balance with proper locking and caching"""
+        """Get user balance with caching"""
         cache_key = f"balance_{growid}"
         cached = await self.cache_manager.get(cache_key)
         if cached:
@@ -167,24 +152,21 @@ class BalanceManagerService(BaseLockHandler):
                 return Balance(cached['wl'], cached['dl'], cached['bgl'])
             return cached
 
-        lock = await self.acquire_lock(cache_key)
-        if not lock:
-            self.logger.warning(f"Failed to acquire lock for get_balance {growid}")
-            return None
-
+        # Read-only: update_balance serializes writes under its own lock key
         try:
-            conn = get_connection()
-            cursor = conn.cursor()
-            
-            cursor.execute(
-                """
-                SELECT balance_wl, balance_dl, balance_bgl 
-                FROM users 
-                WHERE growid = ? COLLATE binary
-                """,
-                (growid,)
-            )
-            result = cursor.fetchone()
+            def query(conn):
+                cursor = conn.cursor()
+                cursor.execute(
+                    """
+                    SELECT balance_wl, balance_dl, balance_bgl 
+                    FROM users 
+                    WHERE growid = ? COLLATE binary
+                    """,
+                    (growid,)
+                )
+                return cursor.fetchone()
+
+            result = await db_pool.run(query)
             
             if result:
                 balance = Balance(
@@ -200,10 +182,50 @@ class BalanceManagerService(BaseLockHandler):
         except Exception as e:
             self.logger.error(f"Error getting balance: {e}")
             return None
-        finally:
-            if conn:
-                conn.close()
-            self.release_lock(cache_key)
+
+    async def get_user_profile(self, discord_id: str) -> Optional[Dict]:
+        """Get GrowID and balance for a Discord user in one query, with caching"""
+        growid = self.cache_manager.peek(f"growid_{discord_id}")
+        if growid:
+            balance = self.cache_manager.peek(f"balance_{growid}")
+            if balance:
+                return {'growid': growid, 'balance': balance}
+
+        try:
+            def query(conn):
+                cursor = conn.cursor()
+                cursor.execute(
+                    """
+                    SELECT g.growid, u.balance_wl, u.balance_dl, u.balance_bgl
+                    FROM user_growid g
+                    LEFT JOIN users u ON u.growid = g.growid COLLATE binary
+                    WHERE g.discord_id = ?
+                    """,
+                    (int(discord_id),)
+                )
+                return cursor.fetchone()
+
+            result = await db_pool.run(query)
+            if not result:
+                return None
+
+            growid = result['growid']
+            await self.cache_manager.set(f"growid_{discord_id}", growid, expires_in=3600)
+
+            balance = None
+            if result['balance_wl'] is not None:
+                balance = Balance(
+                    result['balance_wl'],
+                    result['balance_dl'],
+                    result['balance_bgl']
+                )
+                await self.cache_manager.set(f"balance_{growid}", balance, expires_in=30)
+
+            return {'growid': growid, 'balance': balance}
+
+        except Exception as e:
+            self.logger.error(f"Error getting user profile: {e}")
+            return None
 
     async def update_balance(
         self, 
@@ -219,89 +241,91 @@ class BalanceManagerService(BaseLockHandler):
         if not lock:
             raise TransactionError("System is busy, please try again later")
 
-        conn = None
         try:
-            conn = get_connection()
-            cursor = conn.cursor()
-            
-            # Get current balance with retry
-            for attempt in range(3):
+            def apply_update(conn):
+                cursor = conn.cursor()
+                
+                # Take the write lock up front so contention surfaces here,
+                # failing fast instead of blocking for the pool's busy_timeout
+                busy_timeout = cursor.execute("PRAGMA busy_timeout").fetchone()[0]
+                cursor.execute(f"PRAGMA busy_timeout = {BALANCE_BUSY_TIMEOUT_MS}")
                 try:
-                    cursor.execute(
-                        """
-                        SELECT balance_wl, balance_dl, balance_bgl 
-                        FROM users 
-                        WHERE growid = ? COLLATE binary
-                        """,
-                        (growid,)
-                    )
-                    current = cursor.fetchone()
-                    if current:
-                        break
-                    if attempt == 2:  # Last attempt
-                        raise TransactionError(f"User {growid} not found")
-                    await asyncio.sleep(0.1)  # Short delay before retry
-                except Exception as e:
-                    if attempt == 2:  # Last attempt
-                        raise
-                    await asyncio.sleep(0.1)
+                    cursor.execute("BEGIN IMMEDIATE")
+                finally:
+                    cursor.execute(f"PRAGMA busy_timeout = {busy_timeout}")
             
-            old_balance = Balance(
-                current['balance_wl'],
-                current['balance_dl'],
-                current['balance_bgl']
-            )
+                cursor.execute(
+                    """
+                    SELECT balance_wl, balance_dl, balance_bgl 
+                    FROM users 
+                    WHERE growid = ? COLLATE binary
+                    """,
+                    (growid,)
+                )
+                current = cursor.fetchone()
+                if not current:
+                    raise TransactionError(f"User {growid} not found")
             
-            # Calculate new balance with validation
-            new_wl = max(0, current['balance_wl'] + wl)
-            new_dl = max(0, current['balance_dl'] + dl)
-            new_bgl = max(0, current['balance_bgl'] + bgl)
+                old_balance = Balance(
+                    current['balance_wl'],
+                    current['balance_dl'],
+                    current['balance_bgl']
+                )
             
-            # Additional validation
-            if wl < 0 and abs(wl) > current['balance_wl']:
-                raise TransactionError("Insufficient WL balance")
-            if dl < 0 and abs(dl) > current['balance_dl']:
-                raise TransactionError("Insufficient DL balance")
-            if bgl < 0 and abs(bgl) > current['balance_bgl']:
-                raise TransactionError("Insufficient BGL balance")
+                # Calculate new balance with validation
+                new_wl = max(0, current['balance_wl'] + wl)
+                new_dl = max(0, current['balance_dl'] + dl)
+                new_bgl = max(0, current['balance_bgl'] + bgl)
             
-            # Update balance
-            cursor.execute(
-                """
-                UPDATE users 
-                SET balance_wl = ?, balance_dl = ?, balance_bgl = ?,
-                    updated_at = CURRENT_TIMESTAMP
-                WHERE growid = ? COLLATE binary
-                """,
-                (new_wl, new_dl, new_bgl, growid)
-            )
+                # Additional validation
+                if wl < 0 and abs(wl) > current['balance_wl']:
+                    raise TransactionError("Insufficient WL balance")
+                if dl < 0 and abs(dl) > current['balance_dl']:
+                    raise TransactionError("Insufficient DL balance")
+                if bgl < 0 and abs(bgl) > current['balance_bgl']:
+                    raise TransactionError("Insufficient BGL balance")
             
-            new_balance = Balance(new_wl, new_dl, new_bgl)
+                # Update balance
+                cursor.execute(
+                    """
+                    UPDATE users 
+                    SET balance_wl = ?, balance_dl = ?, balance_bgl = ?,
+                        updated_at = CURRENT_TIMESTAMP
+                    WHERE growid = ? COLLATE binary
+                    """,
+                    (new_wl, new_dl, new_bgl, growid)
+                )
             
-            # Record transaction with retry
-            for attempt in range(3):
-                try:
-                    cursor.execute(
-                        """
-                        INSERT INTO transactions 
-                        (growid, type, details, old_balance, new_balance, created_at) 
-                        VALUES (?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
-                        """,
-                        (
-                            growid,
-                            transaction_type,
-                            details,
-                            old_balance.format(),
-                            new_balance.format()
-                        )
+                new_balance = Balance(new_wl, new_dl, new_bgl)
+            
+                # Record transaction
+                cursor.execute(
+                    """
+                    INSERT INTO transactions 
+                    (growid, type, details, old_balance, new_balance, created_at) 
+                    VALUES (?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+                    """,
+                    (
+                        growid,
+                        transaction_type,
+                        details,
+                        old_balance.format(),
+                        new_balance.format()
                     )
+                )
+            
+                conn.commit()
+                return old_balance, new_balance
+
+            # Only lock contention is worth retrying; anything else fails immediately
+            for attempt in range(BALANCE_UPDATE_RETRIES):
+                try:
+                    old_balance, new_balance = await db_pool.run(apply_update)
                     break
-                except Exception as e:
-                    if attempt == 2:  # Last attempt
+                except sqlite3.OperationalError as e:
+                    if "locked" not in str(e) or attempt == BALANCE_UPDATE_RETRIES - 1:
                         raise
-                    await asyncio.sleep(0.1)
-            
-            conn.commit()
+                    await asyncio.sleep(0.01 * 2 ** attempt)
             
             # Update cache with new balance
             await self.cache_manager.set(f"balance_{growid}", new_balance, expires_in=30)
@@ -317,12 +341,8 @@ class BalanceManagerService(BaseLockHandler):
 
         except Exception as e:
             self.logger.error(f"Error updating balance: {e}")
-            if conn:
-                conn.rollback()
             raise
         finally:
-            if conn:
-                conn.close()
             self.release_lock(f"balance_update_{growid}")
 
     async def get_transaction_history(self, growid: str, limit: int = 10) -> list:
@@ -333,17 +353,17 @@ class BalanceManagerService(BaseLockHandler):
             return cached[:limit]  # Return only requested number of items
 
         try:
-            conn = get_connection()
-            cursor = conn.cursor()
-            
-            cursor.execute("""
-                SELECT * FROM transactions 
-                WHERE growid = ? COLLATE binary
-                ORDER BY created_at DESC
-                LIMIT ?
-            """, (growid, limit))
-            
-            transactions = [dict(row) for row in cursor.fetchall()]
+            def query(conn):
+                cursor = conn.cursor()
+                cursor.execute("""
+                    SELECT * FROM transactions 
+                    WHERE growid = ? COLLATE binary
+                    ORDER BY created_at DESC
+                    LIMIT ?
+                """, (growid, limit))
+                return [dict(row) for row in cursor.fetchall()]
+
+            transactions = await db_pool.run(query)
             
             # Cache full history for 1 minute
             await self.cache_manager.set(cache_key, transactions, expires_in=60)
@@ -353,21 +373,18 @@ class BalanceManagerService(BaseLockHandler):
         except Exception as e:
             self.logger.error(f"Error getting transaction history: {e}")
             return []
-        finally:
-            if conn:
-                conn.close()
 
 class BalanceManagerCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.balance_service = BalanceManagerService(bot)
+        self.balance_service = BalanceManagerService.get(bot)
         self.logger = logging.getLogger("BalanceManagerCog")
 
     async def cog_load(self):
         self.logger.info("BalanceManagerCog loading...")
 
     async def cog_unload(self):
-        await self.balance_service.cleanup()
+        self.balance_service.cleanup()
         self.logger.info("BalanceManagerCog unloaded")
 
 async def setup(bot):
@@ -1,16 +1,75 @@
 import asyncio
 from asyncio import Lock
 import logging
-from typing import Optional, Dict
+from typing import Optional
+from collections import OrderedDict
 from discord.ext import commands
 import discord
 
+MAX_LOCKS = 8192
+# Interactions live for seconds, so only the most recent ones need a lock
+MAX_RESPONSE_LOCKS = 4096
+# Bound for per-user state the cogs keep in memory (cooldowns, spam windows, locks)
+MAX_TRACKED_USERS = 8192
+
+def _lock_in_use(lock: Lock) -> bool:
+    # release() hands the lock to a waiter that may not have run yet, so
+    # locked() alone reports False while a task is about to own it
+    return lock.locked() or bool(getattr(lock, '_waiters', None))
+
+class LockCache:
+    """
+    Map key -> asyncio.Lock dengan eviction LRU
+    
+    Lock yang sedang dipegang atau masih ditunggu tidak pernah dibuang;
+    jika semuanya sedang dipakai, cache boleh melebihi maxsize sementara.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._locks: OrderedDict = OrderedDict()
+
+    def __contains__(self, key) -> bool:
+        return key in self._locks
+
+    def __getitem__(self, key) -> Lock:
+        return self._locks[key]
+
+    def __len__(self) -> int:
+        return len(self._locks)
+
+    def setdefault(self, key, lock: Lock) -> Lock:
+        existing = self._locks.get(key)
+        if existing is not None:
+            self._locks.move_to_end(key)
+            return existing
+        self._locks[key] = lock
+        if len(self._locks) > self.maxsize:
+            self._evict(keep=key)
+        return lock
+
+    def _evict(self, keep):
+        # `keep` is the lock just handed out; its caller is about to acquire it
+        excess = len(self._locks) - self.maxsize
+        idle = []
+        for key, lock in self._locks.items():
+            if len(idle) >= excess:
+                break
+            if key != keep and not _lock_in_use(lock):
+                idle.append(key)
+        for key in idle:
+            del self._locks[key]
+
+    def clear(self):
+        self._locks.clear()
+
 class BaseLockHandler:
     """Handler untuk sistem locking"""
     
     def __init__(self):
-        self._locks: Dict[str, Lock] = {}
-        self._response_locks: Dict[str, Lock] = {}
+        # Bounded so locks for keys that are never seen again get evicted
+        self._locks: LockCache = LockCache(maxsize=MAX_LOCKS)
+        self._response_locks: LockCache = LockCache(maxsize=MAX_RESPONSE_LOCKS)
         self.logger = logging.getLogger(self.__class__.__name__)
         
     async def acquire_lock(self, key: str, timeout: float = 10.0) -> Optional[Lock]:
@@ -24,12 +83,11 @@ class BaseLockHandler:
         Returns:
             Lock object jika berhasil, None jika gagal
         """
-        if key not in self._locks:
-            self._locks[key] = Lock()
+        lock = self._locks.setdefault(key, Lock())
             
         try:
-            await asyncio.wait_for(self._locks[key].acquire(), timeout=timeout)
-            return self._locks[key]
+            await asyncio.wait_for(lock.acquire(), timeout=timeout)
+            return lock
         except asyncio.TimeoutError:
             self.logger.error(f"Failed to acquire lock for {key} within {timeout} seconds")
             return None
@@ -49,11 +107,10 @@ class BaseLockHandler:
             True jika berhasil acquire lock, False jika gagal
         """
         key = str(ctx_or_interaction.id)
-        if key not in self._response_locks:
-            self._response_locks[key] = Lock()
+        lock = self._response_locks.setdefault(key, Lock())
             
         try:
-            await asyncio.wait_for(self._response_locks[key].acquire(), timeout=timeout)
+            await asyncio.wait_for(lock.acquire(), timeout=timeout)
             return True
         except:
             return False
@@ -1,21 +1,96 @@
 import logging
 import time
 import json
-from typing import Optional, Any, Dict
+import sys
+import heapq
+from typing import Optional, Any, Callable, Dict, List, Set, Tuple
 from datetime import datetime, timedelta
 from sqlite3 import Connection, Error as SQLiteError
-from database import get_connection
+from database import db_pool
 import asyncio
 from functools import wraps
+import inspect
 
 logger = logging.getLogger(__name__)
 
+try:
+    from pympler.asizeof import asizeof as _estimate_size
+except ImportError:
+    # Shallow size only: nested dicts/lists are undercounted
+    _estimate_size = sys.getsizeof
+    logger.info("pympler not installed, cache sizes use sys.getsizeof")
+
+# Sentinel so cached None/falsy results can be told apart from a miss
+_MISS = object()
+
+MAX_MEMORY_ITEMS = 1000
+CLEANUP_INTERVAL = 300  # seconds
+# New keys land in a small LRU window before competing for the main segment
+WINDOW_ITEMS = max(1, MAX_MEMORY_ITEMS // 100)
+
+_HALVE_TABLE = bytes(n >> 1 for n in range(256))
+
+class FrequencySketch:
+    """
+    Count-min sketch untuk estimasi frekuensi akses (TinyLFU)
+    
+    Counter 4-bit (maks 15) disimpan satu per byte dalam satu tabel
+    datar (DEPTH baris berurutan); semua counter dibagi dua setiap
+    `sample_size` increment agar frekuensi lama memudar.
+    """
+    DEPTH = 4
+    MAX_COUNT = 15
+    __slots__ = ('_width', '_table', '_sample_size', '_additions')
+    
+    def __init__(self, capacity: int):
+        width = 1
+        while width < capacity * 10:
+            width <<= 1
+        self._width = width
+        self._table = bytearray(width * self.DEPTH)
+        self._sample_size = capacity * 10
+        self._additions = 0
+    
+    def _indexes(self, key: str):
+        # Double hashing: satu hash() per key, baris diturunkan dari dua bagiannya
+        h = hash(key)
+        h1, h2 = h & 0xFFFFFFFF, (h >> 32) | 1
+        width = self._width
+        mask = width - 1
+        return [i * width + ((h1 + i * h2) & mask) for i in range(self.DEPTH)]
+    
+    def increment(self, key: str) -> None:
+        table = self._table
+        for i in self._indexes(key):
+            if table[i] < self.MAX_COUNT:
+                table[i] += 1
+        self._additions += 1
+        if self._additions >= self._sample_size:
+            self._reset()
+    
+    def estimate(self, key: str) -> int:
+        table = self._table
+        return min(table[i] for i in self._indexes(key))
+    
+    def _reset(self) -> None:
+        """Bagi dua semua counter"""
+        self._table = self._table.translate(_HALVE_TABLE)
+        self._additions //= 2
+
+class CacheEntry:
+    """Satu item memory cache; __slots__ menghindari __dict__ per item"""
+    __slots__ = ('value', 'expires_at', 'size')
+    
+    def __init__(self, value: Any, expires_at: float, size: int):
+        self.value = value
+        self.expires_at = expires_at
+        self.size = size
+
 class CacheManager:
     """
     Enhanced Cache Manager dengan Database Integration
     """
     _instance = None
-    _lock = asyncio.Lock()
     
     def __new__(cls):
         if cls._instance is None:
@@ -24,76 +99,164 @@ class CacheManager:
     
     def __init__(self):
         if not hasattr(self, 'initialized'):
-            self.memory_cache: Dict[str, Dict] = {}
+            self.memory_cache: Dict[str, CacheEntry] = {}
+            # W-TinyLFU segments, each ordered oldest -> most recently used
+            self._window: Dict[str, None] = {}
+            self._main: Dict[str, None] = {}
+            self._sketch = FrequencySketch(MAX_MEMORY_ITEMS)
+            # Key family (everything before the last '_') -> keys in memory_cache
+            self._prefix_index: Dict[str, Set[str]] = {}
+            # Running total of the estimated size of memory_cache values
+            self._memory_bytes = 0
+            # (expires_at, key) min-heap; entries may be stale after updates/removals
+            self._expiry_heap: List[Tuple[float, str]] = []
+            self.hits = 0
+            self.misses = 0
+            self._cleanup_task: Optional[asyncio.Task] = None
+            # key -> Future milik loader yang sedang berjalan untuk key itu
+            self._inflight: Dict[str, asyncio.Future] = {}
             self.logger = logging.getLogger('CacheManager')
             self.initialized = True
     
+    def peek(self, key: str, default: Any = None) -> Optional[Any]:
+        """
+        Ambil data dari memory cache saja, tanpa coroutine dan tanpa database
+        
+        Untuk key yang tidak pernah disimpan permanent, sehingga miss
+        tidak perlu dicek ke database.
+        """
+        self._sketch.increment(key)
+        cache_data = self.memory_cache.get(key)
+        if cache_data is not None:
+            if cache_data.expires_at > time.monotonic():
+                self._touch(key)
+                self.hits += 1
+                return cache_data.value
+            self._remove_memory(key)
+        self.misses += 1
+        return default
+    
     async def get(self, key: str, default: Any = None) -> Optional[Any]:
         """
         Ambil data dari cache (memory atau database)
         """
+        self._sketch.increment(key)
+        
+        # Cek memory cache dulu; jalur ini tidak bisa raise, jadi tanpa try
+        cache_data = self.memory_cache.get(key)
+        if cache_data is not None:
+            if cache_data.expires_at > time.monotonic():
+                self._touch(key)
+                self.hits += 1
+                return cache_data.value
+            # Hapus cache yang expired
+            self._remove_memory(key)
+        
+        # Jika tidak ada di memory, cek database
+        return await self._get_from_db(key, default)
+    
+    async def _get_from_db(self, key: str, default: Any) -> Optional[Any]:
+        """Ambil data dari database cache dan simpan ke memory jika valid"""
         try:
-            # Cek memory cache dulu
-            if key in self.memory_cache:
-                cache_data = self.memory_cache[key]
-                if self._is_valid(cache_data):
-                    self.logger.debug(f"Cache hit (memory): {key}")
-                    return cache_data['value']
-                else:
+            def query(conn):
+                cursor = conn.cursor()
+                cursor.execute(
+                    "SELECT value, expires_at FROM cache_table WHERE key = ?",
+                    (key,)
+                )
+                result = cursor.fetchone()
+                if result and datetime.fromisoformat(result['expires_at']) <= datetime.utcnow():
                     # Hapus cache yang expired
-                    del self.memory_cache[key]
+                    cursor.execute("DELETE FROM cache_table WHERE key = ?", (key,))
+                    conn.commit()
+                    return None
+                return result
             
-            # Jika tidak ada di memory, cek database
-            async with self._lock:
-                conn = get_connection()
-                try:
-                    cursor = conn.cursor()
-                    cursor.execute(
-                        "SELECT value, expires_at FROM cache_table WHERE key = ?",
-                        (key,)
-                    )
-                    result = cursor.fetchone()
-                    
-                    if result:
-                        value, expires_at = result
-                        expires_at = datetime.fromisoformat(expires_at)
-                        
-                        if expires_at > datetime.utcnow():
-                            # Cache masih valid
-                            try:
-                                decoded_value = json.loads(value)
-                                # Simpan ke memory cache
-                                self.memory_cache[key] = {
-                                    'value': decoded_value,
-                                    'expires_at': expires_at
-                                }
-                                self.logger.debug(f"Cache hit (database): {key}")
-                                return decoded_value
-                            except json.JSONDecodeError:
-                                self.logger.warning(f"Failed to decode cache value for key: {key}")
-                                return value
-                        else:
-                            # Hapus cache yang expired
-                            cursor.execute("DELETE FROM cache_table WHERE key = ?", (key,))
-                            conn.commit()
-                    
-                    return default
-                    
-                except SQLiteError as e:
-                    self.logger.error(f"Database error in get: {e}")
-                    return default
-                finally:
-                    conn.close()
+            try:
+                result = await db_pool.run(query)
+            except SQLiteError as e:
+                self.logger.error(f"Database error in get: {e}")
+                return default
+            
+            if not result:
+                self.misses += 1
+                return default
+            
+            self.hits += 1
+            value = result['value']
+            try:
+                # Cache masih valid, simpan ke memory cache
+                decoded_value = json.loads(value)
+                expires_in = (datetime.fromisoformat(result['expires_at']) - datetime.utcnow()).total_seconds()
+                self._store_memory(key, decoded_value, expires_in)
+                self.logger.debug(f"Cache hit (database): {key}")
+                return decoded_value
+            except json.JSONDecodeError:
+                self.logger.warning(f"Failed to decode cache value for key: {key}")
+                return value
         
         except Exception as e:
             self.logger.error(f"Error in get: {e}")
             return default
     
+    async def get_or_set(self,
+                         key: str,
+                         loader: Callable[[], Any],
+                         expires_in: int = 3600,
+                         permanent: bool = False) -> Any:
+        """
+        Ambil dari cache, atau jalankan `loader` sekali lalu simpan hasilnya
+        
+        Miss bersamaan untuk key yang sama menunggu loader yang sedang
+        berjalan, bukan memanggilnya lagi.
+        
+        Args:
+            key: Kunci cache
+            loader: Callable tanpa argumen; boleh mengembalikan awaitable
+            expires_in: Waktu kadaluarsa dalam detik (default 1 jam)
+            permanent: Jika True, simpan ke database (default False)
+        """
+        while True:
+            value = await self.get(key, _MISS)
+            if value is not _MISS:
+                return value
+            
+            inflight = self._inflight.get(key)
+            if inflight is None:
+                break
+            try:
+                return await asyncio.shield(inflight)
+            except asyncio.CancelledError:
+                # Yang dibatalkan pemilik loader, bukan kita: ulangi dan
+                # jalankan loader sendiri jika belum ada yang mengambil alih
+                if not inflight.cancelled():
+                    raise
+        
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            result = loader()
+            if inspect.isawaitable(result):
+                result = await result
+            await self.set(key, result, expires_in, permanent)
+            future.set_result(result)
+            return result
+        except Exception as e:
+            future.set_exception(e)
+            # Tandai sudah diambil agar tidak ada warning jika tidak ada yang menunggu
+            future.exception()
+            raise
+        finally:
+            if not future.done():
+                future.cancel()
+            del self._inflight[key]
+    
     async def set(self, 
                   key: str, 
                   value: Any, 
                   expires_in: int = 3600,
-                  permanent: bool = False) -> bool:
+                  permanent: bool = False,
+                  size_hint: Optional[int] = None) -> bool:
         """
         Simpan data ke cache
         
@@ -102,41 +265,35 @@ class CacheManager:
             value: Nilai yang akan disimpan
             expires_in: Waktu kadaluarsa dalam detik (default 1 jam)
             permanent: Jika True, simpan ke database (default False)
+            size_hint: Ukuran value dalam byte jika sudah diketahui,
+                melewati estimasi ukuran
         """
         try:
-            expires_at = datetime.utcnow() + timedelta(seconds=expires_in)
-            
             # Simpan ke memory cache
-            self.memory_cache[key] = {
-                'value': value,
-                'expires_at': expires_at
-            }
+            self._store_memory(key, value, expires_in, size_hint)
             
             # Jika permanent, simpan juga ke database
             if permanent:
-                async with self._lock:
-                    conn = get_connection()
-                    try:
-                        cursor = conn.cursor()
-                        
-                        # Konversi value ke JSON jika perlu
-                        if not isinstance(value, (str, int, float, bool)):
-                            value = json.dumps(value)
-                            
-                        cursor.execute("""
-                            INSERT OR REPLACE INTO cache_table (key, value, expires_at)
-                            VALUES (?, ?, ?)
-                        """, (key, value, expires_at.isoformat()))
-                        
-                        conn.commit()
-                        self.logger.debug(f"Cache set (permanent): {key}")
-                        return True
-                        
-                    except SQLiteError as e:
-                        self.logger.error(f"Database error in set: {e}")
-                        return False
-                    finally:
-                        conn.close()
+                expires_at = datetime.utcnow() + timedelta(seconds=expires_in)
+                
+                # Konversi value ke JSON jika perlu
+                if not isinstance(value, (str, int, float, bool)):
+                    value = json.dumps(value)
+                
+                def store(conn):
+                    conn.execute("""
+                        INSERT OR REPLACE INTO cache_table (key, value, expires_at)
+                        VALUES (?, ?, ?)
+                    """, (key, value, expires_at.isoformat()))
+                    conn.commit()
+                
+                try:
+                    await db_pool.run(store)
+                    self.logger.debug(f"Cache set (permanent): {key}")
+                    return True
+                except SQLiteError as e:
+                    self.logger.error(f"Database error in set: {e}")
+                    return False
             
             self.logger.debug(f"Cache set (memory): {key}")
             return True
@@ -149,46 +306,71 @@ class CacheManager:
         """Hapus item dari cache"""
         try:
             # Hapus dari memory cache
-            if key in self.memory_cache:
-                del self.memory_cache[key]
+            self._remove_memory(key)
             
             # Hapus dari database
-            async with self._lock:
-                conn = get_connection()
-                try:
-                    cursor = conn.cursor()
-                    cursor.execute("DELETE FROM cache_table WHERE key = ?", (key,))
-                    conn.commit()
-                    return True
-                except SQLiteError as e:
-                    self.logger.error(f"Database error in delete: {e}")
-                    return False
-                finally:
-                    conn.close()
+            try:
+                await db_pool.run(self._execute, "DELETE FROM cache_table WHERE key = ?", (key,))
+                return True
+            except SQLiteError as e:
+                self.logger.error(f"Database error in delete: {e}")
+                return False
                     
         except Exception as e:
             self.logger.error(f"Error in delete: {e}")
             return False
     
+    async def invalidate_prefix(self, prefix: str) -> bool:
+        """
+        Hapus semua item berbentuk `{prefix}_{suffix}`, misalnya
+        invalidate_prefix("stock_ABC") untuk semua `stock_ABC_q{n}`
+        
+        Memory cache memakai index per prefix sehingga hanya key yang cocok
+        yang disentuh; database cukup satu query.
+        """
+        try:
+            for key in self._prefix_index.pop(prefix, ()):
+                cache_data = self.memory_cache.pop(key, None)
+                if cache_data is not None:
+                    self._memory_bytes -= cache_data.size
+                    self._window.pop(key, None)
+                    self._main.pop(key, None)
+            
+            pattern = prefix.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+            try:
+                await db_pool.run(
+                    self._execute,
+                    "DELETE FROM cache_table WHERE key LIKE ? ESCAPE '\\'",
+                    (pattern + '\\_%',)
+                )
+                return True
+            except SQLiteError as e:
+                self.logger.error(f"Database error in invalidate_prefix: {e}")
+                return False
+                    
+        except Exception as e:
+            self.logger.error(f"Error in invalidate_prefix: {e}")
+            return False
+    
     async def clear(self) -> bool:
         """Bersihkan semua cache"""
         try:
             # Bersihkan memory cache
             self.memory_cache.clear()
+            self.hits = self.misses = 0
+            self._window.clear()
+            self._main.clear()
+            self._prefix_index.clear()
+            self._memory_bytes = 0
+            self._expiry_heap.clear()
             
             # Bersihkan database cache
-            async with self._lock:
-                conn = get_connection()
-                try:
-                    cursor = conn.cursor()
-                    cursor.execute("DELETE FROM cache_table")
-                    conn.commit()
-                    return True
-                except SQLiteError as e:
-                    self.logger.error(f"Database error in clear: {e}")
-                    return False
-                finally:
-                    conn.close()
+            try:
+                await db_pool.run(self._execute, "DELETE FROM cache_table")
+                return True
+            except SQLiteError as e:
+                self.logger.error(f"Database error in clear: {e}")
+                return False
                     
         except Exception as e:
             self.logger.error(f"Error in clear: {e}")
@@ -198,77 +380,194 @@ class CacheManager:
         """Bersihkan cache yang expired"""
         try:
             # Bersihkan memory cache
-            current_time = datetime.utcnow()
-            expired_keys = [
-                key for key, data in self.memory_cache.items()
-                if data['expires_at'] <= current_time
-            ]
-            for key in expired_keys:
-                del self.memory_cache[key]
+            self._expire_memory()
             
             # Bersihkan database cache
-            async with self._lock:
-                conn = get_connection()
-                try:
-                    cursor = conn.cursor()
-                    cursor.execute(
-                        "DELETE FROM cache_table WHERE expires_at < ?",
-                        (current_time.isoformat(),)
-                    )
-                    conn.commit()
-                except SQLiteError as e:
-                    self.logger.error(f"Database error in cleanup: {e}")
-                finally:
-                    conn.close()
+            try:
+                await db_pool.run(
+                    self._execute,
+                    "DELETE FROM cache_table WHERE expires_at < ?",
+                    (datetime.utcnow().isoformat(),)
+                )
+            except SQLiteError as e:
+                self.logger.error(f"Database error in cleanup: {e}")
                     
         except Exception as e:
             self.logger.error(f"Error in cleanup: {e}")
     
-    def _is_valid(self, cache_data: Dict) -> bool:
-        """Cek apakah cache masih valid"""
-        return cache_data['expires_at'] > datetime.utcnow()
+    def _expire_memory(self) -> None:
+        """Pop hanya item memory yang sudah jatuh tempo, tanpa scan seluruh cache"""
+        now = time.monotonic()
+        heap = self._expiry_heap
+        while heap and heap[0][0] <= now:
+            expires_at, key = heapq.heappop(heap)
+            cache_data = self.memory_cache.get(key)
+            # Lewati entri heap lama milik key yang sudah di-update/dihapus
+            if cache_data is not None and cache_data.expires_at == expires_at:
+                self._remove_memory(key)
+        
+        # Bangun ulang heap jika entri lama menumpuk
+        if len(heap) > 2 * len(self.memory_cache) + 64:
+            self._expiry_heap = [
+                (data.expires_at, key) for key, data in self.memory_cache.items()
+            ]
+            heapq.heapify(self._expiry_heap)
+    
+    def start_cleanup_task(self) -> None:
+        """Jalankan cleanup berkala; tidak membuat task kedua jika sudah berjalan"""
+        if self._cleanup_task and not self._cleanup_task.done():
+            return
+        self._cleanup_task = asyncio.create_task(self._periodic_cleanup())
+    
+    async def stop(self) -> None:
+        """Hentikan cleanup berkala dan tunggu sampai task selesai"""
+        if self._cleanup_task is None:
+            return
+        self._cleanup_task.cancel()
+        try:
+            await self._cleanup_task
+        except asyncio.CancelledError:
+            pass
+        self._cleanup_task = None
+    
+    async def _periodic_cleanup(self) -> None:
+        """Buang item expired dari memory dan database secara berkala"""
+        while True:
+            await asyncio.sleep(CLEANUP_INTERVAL)
+            await self.cleanup()
+    
+    def _store_memory(self, 
+                      key: str, 
+                      value: Any, 
+                      expires_in: float,
+                      size: Optional[int] = None) -> None:
+        """Simpan item ke memory cache dan index prefix-nya"""
+        self._sketch.increment(key)
+        
+        # Buang item yang sudah jatuh tempo dulu (murah jika tidak ada),
+        # supaya item expired tidak ikut bersaing dengan item hidup saat eviction
+        heap = self._expiry_heap
+        if heap and heap[0][0] <= time.monotonic():
+            self._expire_memory()
+        
+        old = self.memory_cache.get(key)
+        if old is not None:
+            self._memory_bytes -= old.size
+        
+        # Ukuran dihitung sekali saat insert, bukan setiap kali statistik diminta
+        if size is None:
+            size = _estimate_size(value)
+        # Deadline monotonic, tidak terpengaruh perubahan jam sistem
+        expires_at = time.monotonic() + expires_in
+        self.memory_cache[key] = CacheEntry(value, expires_at, size)
+        heapq.heappush(self._expiry_heap, (expires_at, key))
+        self._memory_bytes += size
+        
+        if old is not None:
+            self._touch(key)
+            return
+        
+        self._prefix_index.setdefault(key.rpartition('_')[0], set()).add(key)
+        self._window[key] = None
+        if len(self._window) > WINDOW_ITEMS:
+            self._admit(next(iter(self._window)))
+    
+    def _touch(self, key: str) -> None:
+        """Pindahkan key ke ujung (most recently used) segmennya"""
+        segment = self._window if key in self._window else self._main
+        # Key yang diakses berulang biasanya sudah di ujung
+        if next(reversed(segment)) != key:
+            del segment[key]
+            segment[key] = None
+    
+    def _admit(self, candidate: str) -> None:
+        """
+        Pindahkan key terlama di window ke main segment
+        
+        Jika main penuh, candidate hanya masuk bila lebih sering diakses
+        daripada key terlama di main; yang kalah dibuang.
+        """
+        del self._window[candidate]
+        if len(self._main) < MAX_MEMORY_ITEMS - WINDOW_ITEMS:
+            self._main[candidate] = None
+            return
+        
+        victim = next(iter(self._main))
+        if self._sketch.estimate(candidate) > self._sketch.estimate(victim):
+            self._remove_memory(victim)
+            self._main[candidate] = None
+        else:
+            self._remove_memory(candidate)
+    
+    def _remove_memory(self, key: str) -> None:
+        """Hapus item dari memory cache dan index prefix-nya"""
+        cache_data = self.memory_cache.pop(key, None)
+        if cache_data is None:
+            return
+        self._memory_bytes -= cache_data.size
+        self._window.pop(key, None)
+        self._main.pop(key, None)
+        prefix = key.rpartition('_')[0]
+        bucket = self._prefix_index.get(prefix)
+        if bucket is not None:
+            bucket.discard(key)
+            if not bucket:
+                del self._prefix_index[prefix]
+    
+    @staticmethod
+    def _execute(conn: Connection, sql: str, params: tuple = ()) -> None:
+        """Jalankan satu statement tulis dan commit (dipakai lewat db_pool.run)"""
+        conn.execute(sql, params)
+        conn.commit()
 
     async def get_stats(self) -> Dict:
         """Dapatkan statistik cache"""
         try:
-            memory_cache_size = len(self.memory_cache)
-            memory_cache_valid = sum(
-                1 for data in self.memory_cache.values()
-                if self._is_valid(data)
-            )
+            # Setelah item jatuh tempo dibuang, semua sisa item pasti valid
+            self._expire_memory()
+            memory_cache_size = memory_cache_valid = len(self.memory_cache)
             
-            async with self._lock:
-                conn = get_connection()
-                try:
-                    cursor = conn.cursor()
-                    cursor.execute("SELECT COUNT(*) FROM cache_table")
-                    db_cache_size = cursor.fetchone()[0]
-                    
-                    cursor.execute(
-                        "SELECT COUNT(*) FROM cache_table WHERE expires_at > ?",
-                        (datetime.utcnow().isoformat(),)
-                    )
-                    db_cache_valid = cursor.fetchone()[0]
-                    
-                    return {
-                        'memory_cache': {
-                            'total': memory_cache_size,
-                            'valid': memory_cache_valid,
-                            'expired': memory_cache_size - memory_cache_valid
-                        },
-                        'db_cache': {
-                            'total': db_cache_size,
-                            'valid': db_cache_valid,
-                            'expired': db_cache_size - db_cache_valid
-                        }
-                    }
-                finally:
-                    conn.close()
+            def query(conn):
+                cursor = conn.cursor()
+                cursor.execute(
+                    "SELECT COUNT(*), COUNT(CASE WHEN expires_at > ? THEN 1 END) FROM cache_table",
+                    (datetime.utcnow().isoformat(),)
+                )
+                return cursor.fetchone()
+            
+            db_cache_size, db_cache_valid = await db_pool.run(query)
+            lookups = self.hits + self.misses
+            
+            return {
+                # Ringkasan yang dipakai dashboard admin
+                'items': memory_cache_size,
+                'hit_rate': self.hits / lookups * 100 if lookups else 0.0,
+                'memory_usage': self._memory_bytes / (1024 * 1024),
+                'memory_cache': {
+                    'total': memory_cache_size,
+                    'valid': memory_cache_valid,
+                    'expired': memory_cache_size - memory_cache_valid,
+                    'bytes': self._memory_bytes
+                },
+                'db_cache': {
+                    'total': db_cache_size,
+                    'valid': db_cache_valid,
+                    'expired': db_cache_size - db_cache_valid
+                }
+            }
                     
         except Exception as e:
             self.logger.error(f"Error getting cache stats: {e}")
             return {}
 
+def _args_key(args: tuple, kwargs: dict) -> int:
+    """Key argumen tanpa str() seluruh argumen; urutan kwargs tidak berpengaruh"""
+    try:
+        return hash((args, tuple(sorted(kwargs.items()))))
+    except TypeError:
+        # Argumen unhashable (list/dict): fallback ke repr
+        return hash(repr((args, sorted(kwargs.items()))))
+
 # Decorator untuk caching
 def cached(expires_in: int = 3600, permanent: bool = False):
     """
@@ -281,20 +580,14 @@ def cached(expires_in: int = 3600, permanent: bool = False):
     def decorator(func):
         @wraps(func)
         async def wrapper(*args, **kwargs):
-            cache_key = f"{func.__name__}:{hash(str(args))}-{hash(str(kwargs))}"
-            cache_manager = CacheManager()
-            
-            # Coba ambil dari cache
-            cached_value = await cache_manager.get(cache_key)
-            if cached_value is not None:
-                return cached_value
-            
-            # Jika tidak ada di cache, eksekusi fungsi
-            result = await func(*args, **kwargs) if asyncio.iscoroutinefunction(func) else func(*args, **kwargs)
+            cache_key = f"{func.__qualname__}:{_args_key(args, kwargs)}"
             
-            # Simpan ke cache
-            await cache_manager.set(cache_key, result, expires_in, permanent)
-            
-            return result
+            # Ambil dari cache; jika miss, fungsi dieksekusi sekali untuk semua pemanggil
+            return await CacheManager().get_or_set(
+                cache_key,
+                lambda: func(*args, **kwargs),
+                expires_in,
+                permanent
+            )
         return wrapper
     return decorator
\ No newline at end of file
@@ -7,6 +7,7 @@ from typing import Dict, List
 COOLDOWN_SECONDS = 3
 UPDATE_INTERVAL = 55  # seconds
 CACHE_TIMEOUT = 60
+LIVE_MESSAGE_TTL = 30 * 86400  # message ID live stock/buttons, harus bertahan lewat restart
 PAGE_TIMEOUT = 60  # seconds
 ADMIN_CONFIRM_TIMEOUT = 30  # seconds
 INTERACTION_TIMEOUT = 15.0  # seconds
@@ -143,6 +144,9 @@ class ValidationError(Exception):
 
 # Balance Class
 class Balance:
+    # Dibuat di setiap lookup/update balance; tanpa __dict__ per instance
+    __slots__ = ('wl', 'dl', 'bgl', 'total_wls')
+
     def __init__(self, wl: int = 0, dl: int = 0, bgl: int = 0):
         self.wl = wl
         self.dl = dl
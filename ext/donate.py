@@ -1,7 +1,6 @@
 import discord
 from discord.ext import commands
 import logging
-from datetime import datetime
 import json
 import asyncio
 from http.server import BaseHTTPRequestHandler, HTTPServer
@@ -13,11 +12,6 @@ from .constants import (
     MESSAGES,       # Untuk pesan response
     TransactionType # Untuk tipe transaksi DONATION
 )
-# Load config
-with open('config.json') as config_file:
-    config = json.load(config_file)
-
-DONATION_LOG_CHANNEL_ID = int(config['id_donation_log'])
 PORT = 8081
 
 class DonationManager:
@@ -135,7 +129,7 @@ class DonationManager:
             embed = discord.Embed(
                 title="💎 New Donation Received",
                 color=discord.Color.green(),
-                timestamp=datetime.utcnow()
+                timestamp=discord.utils.utcnow()
             )
             
             embed.add_field(name="GrowID", value=growid, inline=True)
@@ -183,7 +177,7 @@ class DonateHandler(BaseHTTPRequestHandler):
             # Log to Discord
             loop.run_until_complete(
                 self.manager.log_to_discord(
-                    DONATION_LOG_CHANNEL_ID,
+                    self.bot.donation_log_channel_id,
                     growid, 
                     wl, 
                     dl, 
@@ -1,16 +1,16 @@
 import logging
 import asyncio
-from typing import Optional, List, Dict
-from datetime import datetime
+import re
+from typing import Optional, List, Dict, Set
+from datetime import datetime, timezone
 
 import discord
 from discord.ext import commands
 from discord.ui import Button, View, Modal, TextInput, Select
 from .constants import (
     COLORS,        # Untuk warna embed
-    MESSAGES,      # Untuk pesan response
-    Balance,       # Untuk display balance
-    TransactionType # Untuk tipe transaksi
+    TransactionType, # Untuk tipe transaksi
+    LIVE_MESSAGE_TTL # Untuk cache message ID
 )
 from .base_handler import BaseLockHandler
 from .cache_manager import CacheManager
@@ -18,6 +18,30 @@ from .product_manager import ProductManagerService
 from .balance_manager import BalanceManagerService
 from .trx import TransactionManager
 
+UNLOAD_TIMEOUT = 5.0  # seconds
+
+# Growtopia names are plain ASCII; str.isalnum() would also let unicode lookalikes through
+_GROWID_RE = re.compile(r'[A-Za-z0-9]{3,20}')
+
+# History row icon per transaction type; anything else is shown as an outgoing 💸
+TRX_EMOJI = {
+    TransactionType.DEPOSIT: "💰",
+    TransactionType.PURCHASE: "🛒",
+}
+
+# Static replies, built once; discord.py serializes embeds on send, so
+# sharing them is safe as long as they are never mutated
+GROWID_REQUIRED_EMBED = discord.Embed(
+    title="❌ Error",
+    description="```diff\n- Please register your GrowID first!```",
+    color=COLORS['error']
+)
+PURCHASE_IN_PROGRESS_EMBED = discord.Embed(
+    title="❌ Purchase Failed",
+    description="```diff\n- Your previous purchase is still being processed```",
+    color=COLORS['error']
+)
+
 class SetGrowIDModal(Modal):
     def __init__(self):
         super().__init__(title="📝 Register Your GrowID")
@@ -35,17 +59,21 @@ class SetGrowIDModal(Modal):
     async def on_submit(self, interaction: discord.Interaction):
         await interaction.response.defer(ephemeral=True)
         try:
-            balance_manager = BalanceManagerService(interaction.client)
+            growid = self.growid.value.strip()
+            if not _GROWID_RE.fullmatch(growid):
+                raise ValueError("GrowID must be 3-20 letters or digits")
+
+            balance_manager = BalanceManagerService.get(interaction.client)
             await balance_manager.register_user(
                 str(interaction.user.id),
-                self.growid.value
+                growid
             )
             
             embed = discord.Embed(
                 title="✅ Registration Successful",
                 description=(
                     f"```yaml\n"
-                    f"GrowID: {self.growid.value}\n"
+                    f"GrowID: {growid}\n"
                     f"Status: Registered Successfully\n"
                     f"```"
                 ),
@@ -64,6 +92,9 @@ class SetGrowIDModal(Modal):
             await interaction.followup.send(embed=error_embed, ephemeral=True)
 
 class PurchaseModal(Modal):
+    # Users with a purchase currently being processed
+    _in_flight: Set[int] = set()
+
     def __init__(self, product: Dict):
         super().__init__(title=f"🛒 Purchase {product['name']}")
         self.product = product
@@ -80,12 +111,18 @@ class PurchaseModal(Modal):
 
     async def on_submit(self, interaction: discord.Interaction):
         await interaction.response.defer(ephemeral=True)
+        user_id = interaction.user.id
+        if user_id in self._in_flight:
+            await interaction.followup.send(embed=PURCHASE_IN_PROGRESS_EMBED, ephemeral=True)
+            return
+
+        self._in_flight.add(user_id)
         try:
             quantity = int(self.quantity.value)
             if quantity <= 0:
                 raise ValueError("Quantity must be positive")
             
-            trx_manager = TransactionManager(interaction.client)
+            trx_manager = TransactionManager.get(interaction.client)
             result = await trx_manager.process_purchase(
                 str(interaction.user.id),
                 self.product['code'],
@@ -121,7 +158,7 @@ class PurchaseModal(Modal):
             
             # Add footer with timestamp
             embed.set_footer(text="Thank you for your purchase!")
-            embed.timestamp = datetime.utcnow()
+            embed.timestamp = datetime.now(timezone.utc)
             
             await interaction.followup.send(embed=embed, ephemeral=True)
             
@@ -132,6 +169,8 @@ class PurchaseModal(Modal):
                 color=COLORS['error']
             )
             await interaction.followup.send(embed=error_embed, ephemeral=True)
+        finally:
+            self._in_flight.discard(user_id)
 
 class ProductSelect(Select):
     def __init__(self, products: List[Dict]):
@@ -161,57 +200,35 @@ class ShopView(View):
         super().__init__(timeout=None)
         self.bot = bot
         self.cache_manager = CacheManager()
-        self.product_manager = ProductManagerService(bot)
-        self.balance_manager = BalanceManagerService(bot)
-        self.trx_manager = TransactionManager(bot)
-        
-        # Add styled buttons
-        self.add_item(
-            Button(
-                style=discord.ButtonStyle.primary,
-                custom_id="register",
-                label="Register GrowID",
-                emoji="📝"
-            )
-        )
-        self.add_item(
-            Button(
-                style=discord.ButtonStyle.success,
-                custom_id="balance",
-                label="My Balance",
-                emoji="💰"
-            )
-        )
-        self.add_item(
-            Button(
-                style=discord.ButtonStyle.success,
-                custom_id="buy",
-                label="Shop Items",
-                emoji="🛒"
-            )
-        )
-        self.add_item(
-            Button(
-                style=discord.ButtonStyle.secondary,
-                custom_id="history",
-                label="History",
-                emoji="📋"
-            )
-        )
-
-    @discord.ui.button(custom_id="register")
+        self.product_manager = ProductManagerService.get(bot)
+        self.balance_manager = BalanceManagerService.get(bot)
+        self.trx_manager = TransactionManager.get(bot)
+
+    @discord.ui.button(
+        style=discord.ButtonStyle.primary,
+        custom_id="register",
+        label="Register GrowID",
+        emoji="📝"
+    )
     async def register_callback(self, interaction: discord.Interaction, button: Button):
         await interaction.response.send_modal(SetGrowIDModal())
 
-    @discord.ui.button(custom_id="balance")
+    @discord.ui.button(
+        style=discord.ButtonStyle.success,
+        custom_id="balance",
+        label="My Balance",
+        emoji="💰"
+    )
     async def balance_callback(self, interaction: discord.Interaction, button: Button):
         await interaction.response.defer(ephemeral=True)
         try:
-            growid = await self.balance_manager.get_growid(str(interaction.user.id))
-            if not growid:
-                raise ValueError("Please register your GrowID first!")
+            # GrowID and balance in one round-trip
+            profile = await self.balance_manager.get_user_profile(str(interaction.user.id))
+            if not profile:
+                await interaction.followup.send(embed=GROWID_REQUIRED_EMBED, ephemeral=True)
+                return
 
-            balance = await self.balance_manager.get_balance(growid)
+            growid, balance = profile['growid'], profile['balance']
             if not balance:
                 raise ValueError("Could not retrieve balance")
 
@@ -248,12 +265,12 @@ class ShopView(View):
             # Add total in WL
             embed.add_field(
                 name="💵 Total Value",
-                value=f"```fix\n{balance.total_wl():,} WL```",
+                value=f"```fix\n{balance.total_wls:,} WL```",
                 inline=False
             )
             
             embed.set_thumbnail(url=interaction.user.display_avatar.url)
-            embed.timestamp = datetime.utcnow()
+            embed.timestamp = datetime.now(timezone.utc)
             
             await interaction.followup.send(embed=embed, ephemeral=True)
 
@@ -265,24 +282,33 @@ class ShopView(View):
             )
             await interaction.followup.send(embed=error_embed, ephemeral=True)
 
-    @discord.ui.button(custom_id="buy")
+    @discord.ui.button(
+        style=discord.ButtonStyle.success,
+        custom_id="buy",
+        label="Shop Items",
+        emoji="🛒"
+    )
     async def buy_callback(self, interaction: discord.Interaction, button: Button):
         await interaction.response.defer(ephemeral=True)
         try:
             # Check registration
             growid = await self.balance_manager.get_growid(str(interaction.user.id))
             if not growid:
-                raise ValueError("Please register your GrowID first!")
+                await interaction.followup.send(embed=GROWID_REQUIRED_EMBED, ephemeral=True)
+                return
 
             # Get available products
             products = await self.product_manager.get_all_products()
+            stock_counts = await self.product_manager.get_stock_counts(
+                [product['code'] for product in products]
+            )
             available_products = []
             
             for product in products:
-                stock_count = await self.product_manager.get_stock_count(product['code'])
+                stock_count = stock_counts[product['code']]
                 if stock_count > 0:
-                    product['stock'] = stock_count
-                    available_products.append(product)
+                    # Copy: the product dicts are the cached objects themselves
+                    available_products.append({**product, 'stock': stock_count})
 
             if not available_products:
                 raise ValueError("No products available at the moment")
@@ -320,47 +346,49 @@ class ShopView(View):
             )
             await interaction.followup.send(embed=error_embed, ephemeral=True)
 
-    @discord.ui.button(custom_id="history")
+    @discord.ui.button(
+        style=discord.ButtonStyle.secondary,
+        custom_id="history",
+        label="History",
+        emoji="📋"
+    )
     async def history_callback(self, interaction: discord.Interaction, button: Button):
         await interaction.response.defer(ephemeral=True)
         try:
             growid = await self.balance_manager.get_growid(str(interaction.user.id))
             if not growid:
-                raise ValueError("Please register your GrowID first!")
+                await interaction.followup.send(embed=GROWID_REQUIRED_EMBED, ephemeral=True)
+                return
 
             history = await self.balance_manager.get_transaction_history(growid, limit=5)
             if not history:
                 raise ValueError("No transaction history found")
 
-            embed = discord.Embed(
-                title="📊 Transaction History",
-                description=f"Recent transactions for `{growid}`",
-                color=COLORS['info']
-            )
-
-            for i, trx in enumerate(history, 1):
-                # Get transaction emoji
-                emoji = "💰" if trx['type'] == TransactionType.DEPOSIT.value else "🛒" if trx['type'] == TransactionType.PURCHASE.value else "💸"
-                
-                # Format timestamp
-                timestamp = datetime.fromisoformat(trx['created_at'].replace('Z', '+00:00'))
-                
-                embed.add_field(
-                    name=f"{emoji} Transaction #{i}",
-                    value=(
-                        f"```yml\n"
-                        f"Type: {trx['type']}\n"
-                        f"Date: {timestamp.strftime('%Y-%m-%d %H:%M:%S')} UTC\n"
-                        f"Details: {trx['details']}\n"
-                        f"Old Balance: {trx['old_balance']}\n"
-                        f"New Balance: {trx['new_balance']}\n"
-                        f"```"
-                    ),
-                    inline=False
-                )
+            # Build the whole payload up front instead of one add_field per row
+            embed = discord.Embed.from_dict({
+                'title': "📊 Transaction History",
+                'description': f"Recent transactions for `{growid}`",
+                'color': COLORS['info'].value,
+                'fields': [
+                    {
+                        'name': f"{TRX_EMOJI.get(trx['type'], '💸')} Transaction #{i}",
+                        'value': (
+                            f"```yml\n"
+                            f"Type: {trx['type']}\n"
+                            f"Date: {trx['created_at'][:19].replace('T', ' ')} UTC\n"
+                            f"Details: {trx['details']}\n"
+                            f"Old Balance: {trx['old_balance']}\n"
+                            f"New Balance: {trx['new_balance']}\n"
+                            f"```"
+                        ),
+                        'inline': False
+                    }
+                    for i, trx in enumerate(history, 1)
+                ]
+            })
 
             embed.set_footer(text="Showing last 5 transactions")
-            embed.timestamp = datetime.utcnow()
+            embed.timestamp = datetime.now(timezone.utc)
             
             await interaction.followup.send(embed=embed, ephemeral=True)
 
@@ -374,25 +402,34 @@ class ShopView(View):
 
 class LiveButtonManager(BaseLockHandler):
     _instance = None
-    _instance_lock = asyncio.Lock()
 
-    def __new__(cls, bot):
+    @classmethod
+    def get(cls, bot) -> 'LiveButtonManager':
+        """Return the shared instance, creating it on first use"""
         if cls._instance is None:
-            cls._instance = super().__new__(cls)
-            cls._instance.initialized = False
+            cls._instance = cls(bot)
         return cls._instance
 
     def __init__(self, bot):
-        if not self.initialized:
-            super().__init__()
-            self.bot = bot
-            self.logger = logging.getLogger("LiveButtonManager")
-            self.cache_manager = CacheManager()
-            self.stock_channel_id = int(self.bot.config.get('id_live_stock', 0))
-            self.current_button_message: Optional[discord.Message] = None
-            self.initialized = True
-
-    async def get_or_create_button_message(self) -> Optional[discord.Message]:
+        super().__init__()
+        self.bot = bot
+        self.logger = logging.getLogger("LiveButtonManager")
+        self.cache_manager = CacheManager()
+        self.stock_channel_id = int(self.bot.config.get('id_live_stock', 0))
+        self.current_button_message: Optional[discord.PartialMessage] = None
+        self._shop_view: Optional[ShopView] = None
+        # Message the shop view was last sent/edited onto in this process
+        self._view_message_id: Optional[int] = None
+        # on_ready fires again on every reconnect, each in its own task
+        self._update_lock = asyncio.Lock()
+
+    def get_shop_view(self) -> 'ShopView':
+        """Return the shared shop view, building it on first use (needs a running loop)"""
+        if self._shop_view is None:
+            self._shop_view = ShopView(self.bot)
+        return self._shop_view
+
+    async def get_or_create_button_message(self) -> Optional[discord.PartialMessage]:
         """Get existing button message or create new one"""
         if not self.stock_channel_id:
             self.logger.error("Stock channel ID not configured!")
@@ -406,14 +443,11 @@ class LiveButtonManager(BaseLockHandler):
         try:
             message_id = await self.cache_manager.get("live_buttons_message_id")
             if message_id:
-                try:
-                    message = await channel.fetch_message(message_id)
-                    self.current_button_message = message
-                    return message
-                except discord.NotFound:
-                    await self.cache_manager.delete("live_buttons_message_id")
-                except Exception as e:
-                    self.logger.error(f"Error fetching button message: {e}")
+                # Only ever edited, so a local PartialMessage saves the GET;
+                # a deleted message surfaces as NotFound on the edit instead
+                message = channel.get_partial_message(message_id)
+                self.current_button_message = message
+                return message
 
             # Create new message with modern embed
             embed = discord.Embed(
@@ -458,20 +492,21 @@ class LiveButtonManager(BaseLockHandler):
                 text="Shop System v2.0",
                 icon_url=self.bot.user.display_avatar.url
             )
-            embed.timestamp = datetime.utcnow()
+            embed.timestamp = datetime.now(timezone.utc)
             
             message = await channel.send(
                 embed=embed,
-                view=ShopView(self.bot)
+                view=self.get_shop_view()
             )
             
             self.current_button_message = message
+            self._view_message_id = message.id
             
             # Cache the message ID
             await self.cache_manager.set(
                 "live_buttons_message_id", 
                 message.id,
-                expires_in=86400,  # 24 hours
+                expires_in=LIVE_MESSAGE_TTL,
                 permanent=True
             )
             
@@ -483,15 +518,34 @@ class LiveButtonManager(BaseLockHandler):
 
     async def update_buttons(self) -> bool:
         """Update the button message"""
+        # Skip rather than queue: a second concurrent run could post a duplicate message
+        if self._update_lock.locked():
+            return True
+
+        async with self._update_lock:
+            return await self._update_buttons()
+
+    async def _update_buttons(self) -> bool:
         try:
             message = await self.get_or_create_button_message()
             if not message:
                 return False
 
-            # Update view with fresh buttons
-            await message.edit(view=ShopView(self.bot))
+            # Components persist on Discord's side; one edit per process is
+            # enough to pick up layout changes, later on_ready calls skip it
+            if message.id == self._view_message_id:
+                return True
+
+            await message.edit(view=self.get_shop_view())
+            self._view_message_id = message.id
             return True
 
+        except discord.NotFound:
+            # Message was deleted; the next update posts a fresh one
+            self.current_button_message = None
+            self._view_message_id = None
+            await self.cache_manager.delete("live_buttons_message_id")
+            return False
         except Exception as e:
             self.logger.error(f"Error updating buttons: {e}")
             return False
@@ -515,7 +569,7 @@ class LiveButtonManager(BaseLockHandler):
 class LiveButtonsCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.button_manager = LiveButtonManager(bot)
+        self.button_manager = LiveButtonManager.get(bot)
         self.logger = logging.getLogger("LiveButtonsCog")
 
     @commands.Cog.listener()
@@ -527,7 +581,11 @@ class LiveButtonsCog(commands.Cog):
         self.logger.info("LiveButtonsCog loading...")
 
     async def cog_unload(self):
-        await self.button_manager.cleanup()
+        # Bounded so a slow/unreachable Discord API can't stall bot shutdown
+        try:
+            await asyncio.wait_for(self.button_manager.cleanup(), timeout=UNLOAD_TIMEOUT)
+        except asyncio.TimeoutError:
+            self.logger.warning("Live buttons cleanup timed out")
         self.logger.info("LiveButtonsCog unloaded")
 
 async def setup(bot):
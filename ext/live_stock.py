@@ -1,101 +1,130 @@
 import logging
 import asyncio
 from typing import Optional, Dict, List
-from datetime import datetime
+from datetime import datetime, timezone
 
 import discord
 from discord.ext import commands, tasks
 from .constants import (
-    Status,          # Untuk status stok
     COLORS,         # Untuk warna embed
     UPDATE_INTERVAL,# Untuk interval update (55 seconds)
-    MESSAGES,       # Untuk pesan error/status
-    CACHE_TIMEOUT  # Untuk cache message ID
+    LIVE_MESSAGE_TTL # Untuk cache message ID
 )
 
-from database import get_connection
 from .base_handler import BaseLockHandler
 from .cache_manager import CacheManager
 from .product_manager import ProductManagerService
 
+MAX_UPDATE_BACKOFF = 3600  # seconds
+UNLOAD_TIMEOUT = 5.0  # seconds
+
+# (emoji, label) keyed by whether the product has stock
+STOCK_STATUS = {
+    True: ("🟢", "Available"),
+    False: ("🔴", "Out of Stock"),
+}
+
 class LiveStockManager(BaseLockHandler):
     _instance = None
-    _instance_lock = asyncio.Lock()
 
-    def __new__(cls, bot):
+    @classmethod
+    def get(cls, bot) -> 'LiveStockManager':
+        """Return the shared instance, creating it on first use"""
         if cls._instance is None:
-            cls._instance = super().__new__(cls)
-            cls._instance.initialized = False
+            cls._instance = cls(bot)
         return cls._instance
 
     def __init__(self, bot):
-        if not self.initialized:
-            super().__init__()  # Initialize BaseLockHandler
-            self.bot = bot
-            self.logger = logging.getLogger("LiveStockManager")
-            self.cache_manager = CacheManager()
-            self.product_manager = ProductManagerService(bot)
-            self.stock_channel_id = int(self.bot.config.get('id_live_stock', 0))
-            self.current_stock_message: Optional[discord.Message] = None
-            self.initialized = True
-
-    async def create_stock_embed(self) -> discord.Embed:
-        """Create a modern looking stock embed"""
-        try:
-            products = await self.product_manager.get_all_products()
+        super().__init__()  # Initialize BaseLockHandler
+        self.bot = bot
+        self.logger = logging.getLogger("LiveStockManager")
+        self.cache_manager = CacheManager()
+        self.product_manager = ProductManagerService.get(bot)
+        self.stock_channel_id = int(self.bot.config.get('id_live_stock', 0))
+        self.current_stock_message: Optional[discord.PartialMessage] = None
+        # Hash of the product state last written to the stock message
+        self._last_state_hash: Optional[int] = None
+        # Static part of the stock embed, copied on every update
+        self._embed_template = discord.Embed(
+            title="🌟 Live Stock Status",
+            description=(
+                "```diff\n"
+                "Welcome to our Growtopia Shop!\n"
+                "Real-time stock information updated every minute\n"
+                "```"
+            ),
+            color=COLORS['info']  # Menggunakan warna dari constants
+        )
+
+    def _build_stock_embed(
+        self,
+        products: List[Dict],
+        stock_counts: Dict[str, int],
+        now: datetime
+    ) -> discord.Embed:
+        """Assemble the stock embed from already fetched data (no I/O)"""
+        embed = self._embed_template.copy()
+
+        # Add server time
+        embed.add_field(
+            name="🕒 Server Time",
+            value=f"```yml\n{now:%Y-%m-%d %H:%M:%S} UTC```",
+            inline=False
+        )
+
+        # Group products by category
+        for product in products:
+            stock_count = stock_counts[product['code']]
             
-            embed = discord.Embed(
-                title="🌟 Live Stock Status",
-                description=(
-                    "```diff\n"
-                    "Welcome to our Growtopia Shop!\n"
-                    "Real-time stock information updated every minute\n"
-                    "```"
-                ),
-                color=COLORS['info']  # Menggunakan warna dari constants
-            )
+            status_emoji, status_text = STOCK_STATUS[stock_count > 0]
 
-            # Add server time
             embed.add_field(
-                name="🕒 Server Time",
-                value=f"```yml\n{datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')} UTC```",
-                inline=False
+                name=f"{status_emoji} {product['name']} ({product['code']})",
+                value=(
+                    f"```yml\nPrice: {product['price']:,} WL\n"
+                    f"Stock: {stock_count} units\nStatus: {status_text}\n```"
+                ),
+                inline=True
             )
 
-            # Group products by category
-            for product in products:
-                stock_count = await self.product_manager.get_stock_count(product['code'])
-                
-                status_emoji = "🟢" if stock_count > 0 else "🔴"
-                status_text = "Available" if stock_count > 0 else "Out of Stock"
-                
-                field_value = (
-                    f"```yml\n"
-                    f"Price: {product['price']:,} WL\n"
-                    f"Stock: {stock_count} units\n"
-                    f"Status: {status_text}\n"
-                    f"```"
-                )
-                
-                embed.add_field(
-                    name=f"{status_emoji} {product['name']} ({product['code']})",
-                    value=field_value,
-                    inline=True
+        embed.set_footer(
+            text="Last Updated",
+            icon_url=self.bot.user.display_avatar.url
+        )
+        embed.timestamp = now
+
+        return embed
+
+    async def create_stock_embed(
+        self,
+        products: Optional[List[Dict]] = None,
+        stock_counts: Optional[Dict[str, int]] = None
+    ) -> discord.Embed:
+        """Create a modern looking stock embed"""
+        try:
+            if products is None:
+                products = await self.product_manager.get_all_products()
+
+            # One query for every product's stock instead of one per product
+            if stock_counts is None:
+                stock_counts = await self.product_manager.get_stock_counts(
+                    [product['code'] for product in products]
                 )
 
-            embed.set_footer(
-                text="Last Updated",
-                icon_url=self.bot.user.display_avatar.url
+            # Discord caps an embed at 25 fields, so building it inline is
+            # cheaper than a thread hop
+            return self._build_stock_embed(
+                products, stock_counts, datetime.now(timezone.utc)
             )
-            embed.timestamp = datetime.utcnow()
-
-            return embed
 
         except Exception as e:
             self.logger.error(f"Error creating stock embed: {e}")
             raise
 
-    async def get_or_create_stock_message(self) -> Optional[discord.Message]:
+    async def get_or_create_stock_message(
+        self,
+        embed: Optional[discord.Embed] = None
+    ) -> Optional[discord.PartialMessage]:
         """Get existing stock message or create new one"""
         if not self.stock_channel_id:
             self.logger.error("Stock channel ID not configured!")
@@ -106,34 +135,39 @@ class LiveStockManager(BaseLockHandler):
             self.logger.error(f"Could not find stock channel {self.stock_channel_id}")
             return None
 
+        # Reuse the message we already hold; a NotFound on edit clears it
+        if self.current_stock_message:
+            return self.current_stock_message
+
         try:
             # Check cache first
             message_id = await self.cache_manager.get("live_stock_message_id")
             if message_id:
-                try:
-                    message = await channel.fetch_message(message_id)
-                    self.current_stock_message = message
-                    return message
-                except discord.NotFound:
-                    await self.cache_manager.delete("live_stock_message_id")
-                except Exception as e:
-                    self.logger.error(f"Error fetching stock message: {e}")
+                # Only ever edited, so a local PartialMessage saves the GET;
+                # a deleted message surfaces as NotFound on the edit instead
+                message = channel.get_partial_message(message_id)
+                self.current_stock_message = message
+                return message
 
             # If no cached message or message not found, create new
-            embed = await self.create_stock_embed()
+            if embed is None:
+                embed = await self.create_stock_embed()
             message = await channel.send(embed=embed)
             self.current_stock_message = message
+            self._last_state_hash = None
             
             # Cache the message ID
             await self.cache_manager.set(
                 "live_stock_message_id", 
                 message.id,
-                expires_in=CACHE_TIMEOUT,  # Menggunakan CACHE_TIMEOUT dari constants
+                expires_in=LIVE_MESSAGE_TTL,
                 permanent=True
             )
             
             return message
 
+        except discord.HTTPException:
+            raise
         except Exception as e:
             self.logger.error(f"Error in get_or_create_stock_message: {e}")
             return None
@@ -141,14 +175,40 @@ class LiveStockManager(BaseLockHandler):
     async def update_stock_display(self) -> bool:
         """Update the live stock display"""
         try:
-            message = await self.get_or_create_stock_message()
+            products = await self.product_manager.get_all_products()
+            stock_counts = await self.product_manager.get_stock_counts(
+                [product['code'] for product in products]
+            )
+
+            # Nothing shown in the embed changed: no fetch, no edit
+            state_hash = hash(tuple(
+                (p['code'], p['name'], p['price'], stock_counts[p['code']])
+                for p in products
+            ))
+            if state_hash == self._last_state_hash and self.current_stock_message:
+                return True
+
+            embed = await self.create_stock_embed(products, stock_counts)
+            had_message = self.current_stock_message is not None
+            message = await self.get_or_create_stock_message(embed)
             if not message:
                 return False
 
-            embed = await self.create_stock_embed()
-            await message.edit(embed=embed)
+            # A freshly sent message already carries this embed
+            if had_message or not isinstance(message, discord.Message):
+                await message.edit(embed=embed)
+            self._last_state_hash = state_hash
             return True
 
+        except discord.NotFound:
+            # Message was deleted; the next tick posts a fresh one
+            self.current_stock_message = None
+            self._last_state_hash = None
+            await self.cache_manager.delete("live_stock_message_id")
+            return False
+        except discord.HTTPException:
+            # Rate limits / edit caps: the update loop backs off instead
+            raise
         except Exception as e:
             self.logger.error(f"Error updating stock display: {e}")
             return False
@@ -157,9 +217,13 @@ class LiveStockManager(BaseLockHandler):
         """Cleanup resources"""
         try:
             if self.current_stock_message:
+                # Single PATCH on the held (partial) message; edit() has no color kwarg
                 await self.current_stock_message.edit(
-                    content="Shop is currently offline. Please wait...",
-                    color=COLORS['warning']  # Menggunakan warna warning dari constants
+                    embed=discord.Embed(
+                        title="🛠️ Shop Offline",
+                        description="```diff\n- Shop is currently offline. Please wait...\n```",
+                        color=COLORS['warning']  # Menggunakan warna warning dari constants
+                    )
                 )
         except Exception as e:
             self.logger.error(f"Error in cleanup: {e}")
@@ -167,17 +231,39 @@ class LiveStockManager(BaseLockHandler):
 class LiveStockCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.stock_manager = LiveStockManager(bot)
+        self.stock_manager = LiveStockManager.get(bot)
         self.logger = logging.getLogger("LiveStockCog")
-        self.update_stock.start()
+        self._consecutive_errors = 0
+
+    async def cog_load(self):
+        # Started here rather than in __init__ so a failed add_cog never leaves
+        # an orphaned loop behind; the guard keeps a reload from starting a second one
+        if not self.update_stock.is_running():
+            self.update_stock.start()
 
     @tasks.loop(seconds=UPDATE_INTERVAL)  # Menggunakan UPDATE_INTERVAL dari constants
     async def update_stock(self):
         """Update stock display periodically"""
         try:
             await self.stock_manager.update_stock_display()
+        except discord.HTTPException as e:
+            # Retrying at the normal pace only digs deeper into the limit
+            self._consecutive_errors += 1
+            delay = min(UPDATE_INTERVAL * 2 ** self._consecutive_errors, MAX_UPDATE_BACKOFF)
+            delay = max(delay, getattr(e, 'retry_after', 0))
+            self.logger.warning(
+                f"Stock update rejected by Discord ({e.status}/{e.code}), "
+                f"next attempt in {delay:.0f}s"
+            )
+            self.update_stock.change_interval(seconds=delay)
+            return
         except Exception as e:
             self.logger.error(f"Error in stock update loop: {e}")
+            return
+
+        if self._consecutive_errors:
+            self._consecutive_errors = 0
+            self.update_stock.change_interval(seconds=UPDATE_INTERVAL)
 
     @update_stock.before_loop
     async def before_update_stock(self):
@@ -187,7 +273,11 @@ class LiveStockCog(commands.Cog):
     async def cog_unload(self):
         """Cleanup when unloading cog"""
         self.update_stock.cancel()
-        await self.stock_manager.cleanup()
+        # Bounded so a slow/unreachable Discord API can't stall bot shutdown
+        try:
+            await asyncio.wait_for(self.stock_manager.cleanup(), timeout=UNLOAD_TIMEOUT)
+        except asyncio.TimeoutError:
+            self.logger.warning("Live stock cleanup timed out")
         self.logger.info("LiveStockCog unloaded")
 
 async def setup(bot):
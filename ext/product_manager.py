@@ -1,6 +1,6 @@
 import logging
-import asyncio
-from typing import Dict, List, Optional
+import sqlite3
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime
 
 import discord
@@ -12,27 +12,25 @@ from .constants import (
     CACHE_TIMEOUT,  # Untuk cache produk
     MESSAGES        # Untuk pesan error/success
 )
-from database import get_connection
+from database import get_connection, db_pool
 from .base_handler import BaseLockHandler
 from .cache_manager import CacheManager
 
 class ProductManagerService(BaseLockHandler):
     _instance = None
-    _instance_lock = asyncio.Lock()
 
-    def __new__(cls, bot):
+    @classmethod
+    def get(cls, bot) -> 'ProductManagerService':
+        """Return the shared instance, creating it on first use"""
         if cls._instance is None:
-            cls._instance = super().__new__(cls)
-            cls._instance.initialized = False
+            cls._instance = cls(bot)
         return cls._instance
 
     def __init__(self, bot):
-        if not self.initialized:
-            super().__init__()  # Initialize BaseLockHandler
-            self.bot = bot
-            self.logger = logging.getLogger("ProductManagerService")
-            self.cache_manager = CacheManager()
-            self.initialized = True
+        super().__init__()  # Initialize BaseLockHandler
+        self.bot = bot
+        self.logger = logging.getLogger("ProductManagerService")
+        self.cache_manager = CacheManager()
 
     async def create_product(self, code: str, name: str, price: int, description: str = None) -> Dict:
         """Create a new product with proper locking and cache invalidation"""
@@ -91,11 +89,7 @@ class ProductManagerService(BaseLockHandler):
         if cached:
             return cached
 
-        lock = await self.acquire_lock(f"product_get_{code}")
-        if not lock:
-            self.logger.warning(f"Failed to acquire lock for getting product {code}")
-            return None
-
+        conn = None
         try:
             conn = get_connection()
             cursor = conn.cursor()
@@ -118,7 +112,6 @@ class ProductManagerService(BaseLockHandler):
         finally:
             if conn:
                 conn.close()
-            self.release_lock(f"product_get_{code}")
 
     async def get_all_products(self) -> List[Dict]:
         """Get all products with caching"""
@@ -126,11 +119,7 @@ class ProductManagerService(BaseLockHandler):
         if cached:
             return cached
 
-        lock = await self.acquire_lock("products_getall")
-        if not lock:
-            self.logger.warning("Failed to acquire lock for getting all products")
-            return []
-
+        conn = None
         try:
             conn = get_connection()
             cursor = conn.cursor()
@@ -139,6 +128,9 @@ class ProductManagerService(BaseLockHandler):
             
             products = [dict(row) for row in cursor.fetchall()]
             await self.cache_manager.set("all_products", products, expires_in=300)  # Cache for 5 minutes
+            # Index each product by code too, so get_product hits memory
+            for product in products:
+                await self.cache_manager.set(f"product_{product['code']}", product, expires_in=300)
             return products
 
         except Exception as e:
@@ -147,7 +139,6 @@ class ProductManagerService(BaseLockHandler):
         finally:
             if conn:
                 conn.close()
-            self.release_lock("products_getall")
 
     async def add_stock_item(self, product_code: str, content: str, added_by: str) -> bool:
         """Add stock item with proper locking"""
@@ -173,14 +164,14 @@ class ProductManagerService(BaseLockHandler):
                 INSERT INTO stock (product_code, content, added_by, status)
                 VALUES (?, ?, ?, ?)
                 """,
-                (product_code, content, added_by, STATUS_AVAILABLE)
+                (product_code, content, added_by, Status.AVAILABLE)
             )
             
             conn.commit()
             
             # Invalidate relevant caches
             await self.cache_manager.delete(f"stock_count_{product_code}")
-            await self.cache_manager.delete(f"stock_{product_code}")
+            await self.cache_manager.invalidate_prefix(f"stock_{product_code}")
             
             self.logger.info(f"Stock added for {product_code}")
             return True
@@ -195,17 +186,65 @@ class ProductManagerService(BaseLockHandler):
                 conn.close()
             self.release_lock(f"stock_add_{product_code}")
 
+    async def add_stock_items(
+        self, product_code: str, contents: List[str], added_by: str
+    ) -> Tuple[int, List[str]]:
+        """Add many stock items in one transaction; returns (added, per-item errors)"""
+        lock = await self.acquire_lock(f"stock_add_{product_code}")
+        if not lock:
+            raise TransactionError("System is busy, please try again later")
+
+        try:
+            def insert(conn):
+                cursor = conn.cursor()
+                cursor.execute(
+                    "SELECT code FROM products WHERE code = ? COLLATE NOCASE",
+                    (product_code,)
+                )
+                if not cursor.fetchone():
+                    raise TransactionError(f"Product {product_code} not found")
+
+                added = 0
+                errors = []
+                for i, content in enumerate(contents, 1):
+                    # A failed INSERT only undoes itself, not the whole transaction
+                    try:
+                        cursor.execute(
+                            """
+                            INSERT INTO stock (product_code, content, added_by, status)
+                            VALUES (?, ?, ?, ?)
+                            """,
+                            (product_code, content, added_by, Status.AVAILABLE)
+                        )
+                        added += 1
+                    except sqlite3.IntegrityError as e:
+                        errors.append(f"Item {i}: {e}")
+                conn.commit()
+                return added, errors
+
+            added, errors = await db_pool.run(insert)
+
+            # Invalidate relevant caches
+            await self.cache_manager.delete(f"stock_count_{product_code}")
+            await self.cache_manager.invalidate_prefix(f"stock_{product_code}")
+
+            self.logger.info(f"{added} stock items added for {product_code}")
+            return added, errors
+
+        except Exception as e:
+            self.logger.error(f"Error adding stock items: {e}")
+            raise
+        finally:
+            self.release_lock(f"stock_add_{product_code}")
+
     async def get_available_stock(self, product_code: str, quantity: int = 1) -> List[Dict]:
-        """Get available stock with proper locking"""
+        """Get available stock with caching"""
         cache_key = f"stock_{product_code}_q{quantity}"
         cached = await self.cache_manager.get(cache_key)
         if cached:
             return cached
 
-        lock = await self.acquire_lock(f"stock_get_{product_code}")
-        if not lock:
-            raise TransactionError("System is busy, please try again later")
-
+        conn = None
         try:
             conn = get_connection()
             cursor = conn.cursor()
@@ -216,7 +255,7 @@ class ProductManagerService(BaseLockHandler):
                 WHERE product_code = ? AND status = ?
                 ORDER BY added_at ASC
                 LIMIT ?
-            """, (product_code, STATUS_AVAILABLE, quantity))
+            """, (product_code, Status.AVAILABLE, quantity))
             
             result = [{
                 'id': row['id'],
@@ -234,7 +273,6 @@ class ProductManagerService(BaseLockHandler):
         finally:
             if conn:
                 conn.close()
-            self.release_lock(f"stock_get_{product_code}")
 
     async def get_stock_count(self, product_code: str) -> int:
         """Get stock count with caching"""
@@ -243,11 +281,7 @@ class ProductManagerService(BaseLockHandler):
         if cached is not None:
             return cached
 
-        lock = await self.acquire_lock(f"stock_count_{product_code}")
-        if not lock:
-            self.logger.warning(f"Failed to acquire lock for stock count {product_code}")
-            return 0
-
+        conn = None
         try:
             conn = get_connection()
             cursor = conn.cursor()
@@ -255,7 +289,7 @@ class ProductManagerService(BaseLockHandler):
                 SELECT COUNT(*) as count 
                 FROM stock 
                 WHERE product_code = ? AND status = ?
-            """, (product_code, STATUS_AVAILABLE))
+            """, (product_code, Status.AVAILABLE))
             
             result = cursor.fetchone()['count']
             await self.cache_manager.set(cache_key, result, expires_in=30)  # Cache for 30 seconds
@@ -267,7 +301,43 @@ class ProductManagerService(BaseLockHandler):
         finally:
             if conn:
                 conn.close()
-            self.release_lock(f"stock_count_{product_code}")
+
+    async def get_stock_counts(self, product_codes: List[str]) -> Dict[str, int]:
+        """Get stock counts for several products with a single query for cache misses"""
+        counts = {}
+        missing = []
+        for code in product_codes:
+            cached = self.cache_manager.peek(f"stock_count_{code}")
+            if cached is not None:
+                counts[code] = cached
+            else:
+                missing.append(code)
+
+        if not missing:
+            return counts
+
+        try:
+            def query(conn):
+                cursor = conn.cursor()
+                cursor.execute(f"""
+                    SELECT product_code, COUNT(*) as count
+                    FROM stock
+                    WHERE product_code IN ({','.join('?' * len(missing))}) AND status = ?
+                    GROUP BY product_code
+                """, (*missing, Status.AVAILABLE))
+                return {row['product_code']: row['count'] for row in cursor.fetchall()}
+
+            fetched = await db_pool.run(query)
+            for code in missing:
+                counts[code] = fetched.get(code, 0)
+                await self.cache_manager.set(f"stock_count_{code}", counts[code], expires_in=30)
+
+        except Exception as e:
+            self.logger.error(f"Error getting stock counts: {e}")
+            for code in missing:
+                counts[code] = 0
+
+        return counts
 
     async def update_stock_status(self, stock_id: int, status: str, buyer_id: str = None) -> bool:
         """Update stock status with proper locking"""
@@ -308,8 +378,7 @@ class ProductManagerService(BaseLockHandler):
             await self.cache_manager.delete(f"stock_count_{product_code}")
             await self.cache_manager.delete(f"stock_{product_code}")
             # Also invalidate any quantity specific caches
-            for i in range(1, 101):  # Reasonable range for quantities
-                await self.cache_manager.delete(f"stock_{product_code}_q{i}")
+            await self.cache_manager.invalidate_prefix(f"stock_{product_code}")
             
             self.logger.info(f"Stock {stock_id} status updated to {status}")
             return True
@@ -330,11 +399,7 @@ class ProductManagerService(BaseLockHandler):
         if cached:
             return cached
 
-        lock = await self.acquire_lock("world_info_get")
-        if not lock:
-            self.logger.warning("Failed to acquire lock for world info")
-            return None
-
+        conn = None
         try:
             conn = get_connection()
             cursor = conn.cursor()
@@ -354,7 +419,6 @@ class ProductManagerService(BaseLockHandler):
         finally:
             if conn:
                 conn.close()
-            self.release_lock("world_info_get")
 
     async def update_world_info(self, world: str, owner: str, bot: str) -> bool:
         """Update world info with proper locking"""
@@ -394,14 +458,14 @@ class ProductManagerService(BaseLockHandler):
 class ProductManagerCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.product_service = ProductManagerService(bot)
+        self.product_service = ProductManagerService.get(bot)
         self.logger = logging.getLogger("ProductManagerCog")
 
     async def cog_load(self):
         self.logger.info("ProductManagerCog loading...")
 
     async def cog_unload(self):
-        await self.product_service.cleanup()
+        self.product_service.cleanup()
         self.logger.info("ProductManagerCog unloaded")
 
 async def setup(bot):
@@ -1,5 +1,4 @@
 import logging
-import asyncio
 from typing import Optional, Dict, List, Union
 from datetime import datetime
 
@@ -12,7 +11,7 @@ from .constants import (
     TransactionError, # Untuk error handling
     MESSAGES        # Untuk pesan error/success
 )
-from database import get_connection
+from database import db_pool
 from .base_handler import BaseLockHandler
 from .cache_manager import CacheManager
 from .product_manager import ProductManagerService
@@ -20,23 +19,21 @@ from .balance_manager import BalanceManagerService
 
 class TransactionManager(BaseLockHandler):
     _instance = None
-    _instance_lock = asyncio.Lock()
 
-    def __new__(cls, bot):
+    @classmethod
+    def get(cls, bot) -> 'TransactionManager':
+        """Return the shared instance, creating it on first use"""
         if cls._instance is None:
-            cls._instance = super().__new__(cls)
-            cls._instance.initialized = False
+            cls._instance = cls(bot)
         return cls._instance
 
     def __init__(self, bot):
-        if not self.initialized:
-            super().__init__()  # Initialize BaseLockHandler
-            self.bot = bot
-            self.logger = logging.getLogger("TransactionManager")
-            self.cache_manager = CacheManager()
-            self.product_manager = ProductManagerService(bot)
-            self.balance_manager = BalanceManagerService(bot)
-            self.initialized = True
+        super().__init__()  # Initialize BaseLockHandler
+        self.bot = bot
+        self.logger = logging.getLogger("TransactionManager")
+        self.cache_manager = CacheManager()
+        self.product_manager = ProductManagerService.get(bot)
+        self.balance_manager = BalanceManagerService.get(bot)
 
     async def process_purchase(
         self, 
@@ -52,119 +49,136 @@ class TransactionManager(BaseLockHandler):
         if not lock:
             raise TransactionError("System is busy processing another transaction")
 
-        conn = None
         try:
-            # Get buyer's GrowID and verify registration
-            growid = await self.balance_manager.get_growid(buyer_id)
-            if not growid:
-                raise TransactionError("You need to register your GrowID first!")
+            def purchase(conn):
+                cursor = conn.cursor()
 
-            # Verify product exists and get details
-            product = await self.product_manager.get_product(product_code)
-            if not product:
-                raise TransactionError(f"Product {product_code} not found")
+                # Every check runs inside the write transaction, so stock and
+                # balance cannot change between validation and the purchase
+                cursor.execute("BEGIN IMMEDIATE")
 
-            # Check stock availability
-            available_stock = await self.product_manager.get_available_stock(product_code, quantity)
-            if not available_stock or len(available_stock) < quantity:
-                raise TransactionError(
-                    f"Insufficient stock! Only {len(available_stock)} available"
+                cursor.execute(
+                    """
+                    SELECT g.growid, u.balance_wl, u.balance_dl, u.balance_bgl
+                    FROM user_growid g
+                    JOIN users u ON u.growid = g.growid COLLATE binary
+                    WHERE g.discord_id = ?
+                    """,
+                    (int(buyer_id),)
                 )
+                user = cursor.fetchone()
+                if not user:
+                    raise TransactionError("You need to register your GrowID first!")
 
-            # Calculate total price
-            total_price = product['price'] * quantity
-
-            # Get current balance
-            balance = await self.balance_manager.get_balance(growid)
-            if not balance:
-                raise TransactionError("Could not retrieve balance")
+                cursor.execute(
+                    "SELECT code, name, price FROM products WHERE code = ? COLLATE NOCASE",
+                    (product_code,)
+                )
+                product = cursor.fetchone()
+                if not product:
+                    raise TransactionError(f"Product {product_code} not found")
 
-            # Convert price to WL if needed and check balance
-            total_wl = total_price
-            if total_wl > balance.total_wl():
-                raise TransactionError(
-                    f"Insufficient balance! Need {total_wl:,} WL, you have {balance.total_wl():,} WL"
+                cursor.execute(
+                    """
+                    SELECT id, content FROM stock
+                    WHERE product_code = ? AND status = ?
+                    ORDER BY id
+                    LIMIT ?
+                    """,
+                    (product['code'], Status.AVAILABLE, quantity)
                 )
+                items = cursor.fetchall()
+                if len(items) < quantity:
+                    raise TransactionError(
+                        f"Insufficient stock! Only {len(items)} available"
+                    )
 
-            conn = get_connection()
-            cursor = conn.cursor()
-            
-            try:
-                # Begin transaction
-                conn.execute("BEGIN TRANSACTION")
+                old_balance = Balance(
+                    user['balance_wl'], user['balance_dl'], user['balance_bgl']
+                )
+                total_wl = product['price'] * quantity
+                if total_wl > old_balance.total_wls:
+                    raise TransactionError(
+                        f"Insufficient balance! Need {total_wl:,} WL, "
+                        f"you have {old_balance.total_wls:,} WL"
+                    )
 
-                # Update stock status
-                stock_ids = [item['id'] for item in available_stock[:quantity]]
-                content_list = [item['content'] for item in available_stock[:quantity]]
+                # Pay from the total value; change comes back in the largest locks
+                new_balance = Balance.from_wls(old_balance.total_wls - total_wl)
 
                 cursor.executemany(
                     """
-                    UPDATE stock 
+                    UPDATE stock
                     SET status = ?, buyer_id = ?, updated_at = CURRENT_TIMESTAMP
                     WHERE id = ?
                     """,
-                    [(STATUS_SOLD, buyer_id, stock_id) for stock_id in stock_ids]
+                    [(Status.SOLD, buyer_id, item['id']) for item in items]
                 )
 
-                # Update balance
-                new_balance = await self.balance_manager.update_balance(
-                    growid=growid,
-                    wl=-total_wl,
-                    details=f"Purchase {quantity}x {product['name']}",
-                    transaction_type=TransactionType.PURCHASE.value
+                cursor.execute(
+                    """
+                    UPDATE users
+                    SET balance_wl = ?, balance_dl = ?, balance_bgl = ?,
+                        updated_at = CURRENT_TIMESTAMP
+                    WHERE growid = ? COLLATE binary
+                    """,
+                    (new_balance.wl, new_balance.dl, new_balance.bgl, user['growid'])
                 )
 
-                # Record transaction
                 cursor.execute(
                     """
-                    INSERT INTO transactions 
+                    INSERT INTO transactions
                     (growid, type, details, old_balance, new_balance, created_at)
                     VALUES (?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
                     """,
                     (
-                        growid,
-                        TransactionType.PURCHASE.value,
+                        user['growid'],
+                        TransactionType.PURCHASE,
                         f"Purchased {quantity}x {product['name']} for {total_wl:,} WL",
-                        balance.format(),
+                        old_balance.format(),
                         new_balance.format()
                     )
                 )
 
                 conn.commit()
+                return (
+                    user['growid'],
+                    dict(product),
+                    [item['content'] for item in items],
+                    total_wl,
+                    new_balance
+                )
 
-                # Invalidate relevant caches
-                await self.cache_manager.delete(f"stock_count_{product_code}")
-                await self.cache_manager.delete(f"stock_{product_code}")
-                await self.cache_manager.delete(f"balance_{growid}")
-                await self.cache_manager.delete(f"trx_history_{growid}")
+            growid, product, content_list, total_wl, new_balance = await db_pool.run(purchase)
 
-                self.logger.info(
-                    f"Purchase successful: {growid} bought {quantity}x {product_code}"
-                )
+            # Invalidate relevant caches
+            await self.cache_manager.delete(f"stock_count_{product['code']}")
+            await self.cache_manager.delete(f"stock_{product['code']}")
+            await self.cache_manager.invalidate_prefix(f"stock_{product['code']}")
+            await self.cache_manager.set(f"balance_{growid}", new_balance, expires_in=30)
+            await self.cache_manager.delete(f"trx_history_{growid}")
 
-                return {
-                    'status': 'success',
-                    'message': (
-                        f"Successfully purchased {quantity}x {product['name']}\n"
-                        f"Total paid: {total_wl:,} WL\n"
-                        f"New balance: {new_balance.format()}"
-                    ),
-                    'content': content_list,
-                    'total_paid': total_wl
-                }
-
-            except Exception as e:
-                conn.rollback()
-                raise TransactionError(f"Transaction failed: {str(e)}")
+            self.logger.info(
+                f"Purchase successful: {growid} bought {quantity}x {product['code']}"
+            )
 
-        except TransactionError as e:
+            return {
+                'status': 'success',
+                'message': (
+                    f"Successfully purchased {quantity}x {product['name']}\n"
+                    f"Total paid: {total_wl:,} WL\n"
+                    f"New balance: {new_balance.format()}"
+                ),
+                'content': content_list,
+                'total_paid': total_wl
+            }
+
+        except TransactionError:
             raise
         except Exception as e:
             self.logger.error(f"Error processing purchase: {e}")
             raise TransactionError("An unexpected error occurred")
         finally:
-            if conn:
-                conn.close()
             self.release_lock(f"purchase_{buyer_id}_{product_code}")
 
     async def process_deposit(
@@ -207,7 +221,7 @@ class TransactionManager(BaseLockHandler):
                 dl=dl,
                 bgl=bgl,
                 details=details,
-                transaction_type=TransactionType.DEPOSIT.value
+                transaction_type=TransactionType.DEPOSIT
             )
 
             self.logger.info(
@@ -247,13 +261,12 @@ class TransactionManager(BaseLockHandler):
             raise TransactionError("System is busy processing another transaction")
 
         try:
-            # Verify user registration
-            growid = await self.balance_manager.get_growid(user_id)
-            if not growid:
+            # Verify registration and get current balance in one round-trip
+            profile = await self.balance_manager.get_user_profile(user_id)
+            if not profile:
                 raise TransactionError("You need to register your GrowID first!")
 
-            # Get current balance
-            current_balance = await self.balance_manager.get_balance(growid)
+            growid, current_balance = profile['growid'], profile['balance']
             if not current_balance:
                 raise TransactionError("Could not retrieve balance")
 
@@ -263,9 +276,9 @@ class TransactionManager(BaseLockHandler):
                 raise TransactionError("Withdrawal amount must be greater than 0")
 
             # Check if sufficient balance
-            if total_wl > current_balance.total_wl():
+            if total_wl > current_balance.total_wls:
                 raise TransactionError(
-                    f"Insufficient balance! You have {current_balance.total_wl():,} WL"
+                    f"Insufficient balance! You have {current_balance.total_wls:,} WL"
                 )
 
             # Process withdrawal
@@ -284,7 +297,7 @@ class TransactionManager(BaseLockHandler):
                 dl=-dl,
                 bgl=-bgl,
                 details=details,
-                transaction_type=TransactionType.WITHDRAWAL.value
+                transaction_type=TransactionType.WITHDRAW
             )
 
             self.logger.info(
@@ -313,7 +326,7 @@ class TransactionManager(BaseLockHandler):
 class TransactionCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.trx_manager = TransactionManager(bot)
+        self.trx_manager = TransactionManager.get(bot)
         self.logger = logging.getLogger("TransactionCog")
 
     async def cog_load(self):
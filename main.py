@@ -4,27 +4,46 @@ import os
 import json
 import logging
 import asyncio
+import time
+import atexit
+import queue
+from logging.handlers import QueueHandler, QueueListener
 import aiohttp
 import sqlite3
 from pathlib import Path
-from database import setup_database, get_connection
-from datetime import datetime
+from database import setup_database, get_connection, db_pool
 from utils.command_handler import AdvancedCommandHandler
 from ext.base_handler import BaseLockHandler, BaseResponseHandler
 from ext.cache_manager import CacheManager
 
+try:
+    # discord.py also switches its own (de)serialization to orjson when installed
+    from orjson import loads as json_loads
+except ImportError:
+    json_loads = json.loads
+
 # Setup logging dengan file handler
 log_dir = Path('logs')
 log_dir.mkdir(exist_ok=True)
 
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(log_dir / 'bot.log'),
-        logging.StreamHandler()
-    ]
-)
+# Records are handed to a queue; a listener thread does the actual
+# file/console writes so logging never blocks the event loop
+log_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+log_handlers = [
+    logging.FileHandler(log_dir / 'bot.log'),
+    logging.StreamHandler()
+]
+for handler in log_handlers:
+    handler.setFormatter(log_formatter)
+
+log_queue = queue.SimpleQueue()
+log_listener = QueueListener(log_queue, *log_handlers, respect_handler_level=True)
+log_listener.start()
+atexit.register(log_listener.stop)
+
+root_logger = logging.getLogger()
+root_logger.setLevel(logging.INFO)
+root_logger.addHandler(QueueHandler(log_queue))
 
 logger = logging.getLogger(__name__)
 
@@ -46,8 +65,8 @@ def load_config():
     }
     
     try:
-        with open('config.json', 'r') as config_file:
-            config = json.load(config_file)
+        with open('config.json', 'rb') as config_file:
+            config = json_loads(config_file.read())
 
         # Validate and convert types
         for key, expected_type in required_keys.items():
@@ -98,13 +117,14 @@ class MyBot(commands.Bot, BaseLockHandler, BaseResponseHandler):
         self.donation_log_channel_id = DONATION_LOG_CHANNEL_ID
         self.history_buy_channel_id = HISTORY_BUY_CHANNEL_ID
         self.config = config
-        self.startup_time = datetime.utcnow()
+        self.startup_time = time.monotonic()  # uptime only, immune to clock changes
         self.command_handler = AdvancedCommandHandler(self)
         self.cache_manager = CacheManager()
 
     async def setup_hook(self):
         """Initialize bot components"""
         self.session = aiohttp.ClientSession()
+        self.cache_manager.start_cleanup_task()
         
         # Load extensions with proper error handling
         extensions = [
@@ -151,6 +171,7 @@ class MyBot(commands.Bot, BaseLockHandler, BaseResponseHandler):
         
         # Cleanup cache
         try:
+            await self.cache_manager.stop()
             await self.cache_manager.cleanup()
             logger.info("Cache cleaned up successfully")
         except Exception as e:
@@ -160,9 +181,13 @@ class MyBot(commands.Bot, BaseLockHandler, BaseResponseHandler):
         if self.session:
             await self.session.close()
             logger.info("Session closed")
-            
+
+        # Unloads the cogs, whose cleanup may still write to the database
         await super().close()
 
+        # Close pooled database connections
+        await db_pool.close()
+
     async def on_ready(self):
         """Event when bot is ready"""
         logger.info(f'Bot {self.user.name} is ready!')
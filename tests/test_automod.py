@@ -0,0 +1,33 @@
+import pytest
+
+pytest.importorskip("discord")
+pytest.importorskip("aiofiles")
+
+from cogs.automod import compile_banned_matcher
+
+
+def test_empty_config_has_no_matcher():
+    assert compile_banned_matcher([], []) is None
+
+
+def test_plain_words_match_whole_words_only():
+    matcher = compile_banned_matcher(["spam"], [])
+    assert matcher.search("no spam here").group(0) == "spam"
+    assert matcher.search("spammer") is None
+
+
+@pytest.mark.parametrize("entry, text, expected", [
+    (".exe", "download setup.exe now", None),
+    (".exe", "just run the .exe file", ".exe"),
+    ("@everyone", "hey @everyone look", "@everyone"),
+    ("🍆", "lol 🍆 lol", "🍆"),
+])
+def test_punctuation_edged_words(entry, text, expected):
+    match = compile_banned_matcher([entry], []).search(text)
+    assert (match.group(0) if match else None) == expected
+
+
+def test_punctuation_edged_wildcard():
+    matcher = compile_banned_matcher([], ["f*ck!"])
+    assert matcher.search("well f**ck! that").group(0) == "f**ck!"
+    assert matcher.search("f**ck!ing") is None
@@ -0,0 +1,36 @@
+import asyncio
+
+from ext.cache_manager import CacheManager
+
+
+def test_get_or_set_waiter_survives_owner_cancellation(tmp_path, monkeypatch):
+    # Cache misses fall through to shop.db; keep it out of the repo
+    monkeypatch.chdir(tmp_path)
+
+    async def scenario():
+        cache = CacheManager()
+        key = "test_get_or_set_owner_cancelled"
+        started = asyncio.Event()
+        calls = []
+
+        async def loader():
+            calls.append(1)
+            if len(calls) == 1:
+                started.set()
+                await asyncio.sleep(3600)
+            return "loaded"
+
+        owner = asyncio.create_task(cache.get_or_set(key, loader))
+        await started.wait()
+        waiter = asyncio.create_task(cache.get_or_set(key, loader))
+        # Let the waiter finish its own cache miss and block on the owner
+        await asyncio.sleep(0.2)
+
+        owner.cancel()
+        result = await asyncio.wait_for(waiter, timeout=1)
+
+        assert owner.cancelled()
+        assert result == "loaded"
+        assert len(calls) == 2
+
+    asyncio.run(scenario())
@@ -1,33 +1,42 @@
 import discord
 from discord.ext import commands
 import logging
-import json
+import time
+from collections import defaultdict, deque
 from datetime import datetime
 from typing import Optional, Dict, List, Tuple, Any
+from cachetools import TTLCache, TLRUCache
 from ext.cache_manager import CacheManager
 
 logger = logging.getLogger(__name__)
 
+MAX_TRACKED_USERS = 8192
+PERMISSION_CACHE_TTL = 300  # seconds
+
 class CommandAnalytics:
     def __init__(self):
         self.cache_manager = CacheManager()
+        # command -> live stats, loaded from cache once and updated in place
+        self._stats: Dict[str, Dict[str, Any]] = {}
         
-    async def track_command(self, ctx: commands.Context, command: str) -> None:
-        """Track command usage statistics"""
-        cache_key = f"analytics:command:{command}"
-        stats = await self.cache_manager.get(cache_key) or {
+    async def _load_command_stats(self, command: str) -> Dict[str, Any]:
+        """Load persisted stats for a command, converting lists back to sets once"""
+        stats = await self.cache_manager.get(f"analytics:command:{command}") or {
             'total_uses': 0,
-            'users': set(),
-            'channels': set(),
+            'users': [],
+            'channels': [],
             'last_used': None,
             'peak_hour_usage': [0] * 24
         }
+        stats['users'] = set(stats['users'])
+        stats['channels'] = set(stats['channels'])
+        self._stats[command] = stats
+        return stats
         
-        # Convert sets from list if loaded from cache
-        if isinstance(stats['users'], list):
-            stats['users'] = set(stats['users'])
-        if isinstance(stats['channels'], list):
-            stats['channels'] = set(stats['channels'])
+    async def track_command(self, ctx: commands.Context, command: str) -> None:
+        """Track command usage statistics"""
+        cache_key = f"analytics:command:{command}"
+        stats = self._stats.get(command) or await self._load_command_stats(command)
         
         # Update stats
         now = datetime.utcnow()
@@ -79,23 +88,18 @@ class AdvancedCommandHandler:
         self.analytics = CommandAnalytics()
         self.cache_manager = CacheManager()
         
-        # Load config
-        try:
-            with open('config.json', 'r') as f:
-                self.config = json.load(f)
-        except FileNotFoundError:
-            logger.error("config.json not found! Using default values.")
-            self.config = {}
-        except json.JSONDecodeError:
-            logger.error("Invalid config.json! Using default values.")
-            self.config = {}
+        # Config was already loaded and validated once at startup (main.py)
+        self.config = bot.config
         
         # Setup default values
         self.cooldowns = {}
-        self.custom_cooldowns = self.config.get('cooldowns', {
+        cooldowns = self.config.get('cooldowns', {
             'default': 3,
             'admin': 1
         })
+        # Unknown commands resolve to the default in a single subscript
+        default_cooldown = cooldowns.get('default', 3)
+        self.custom_cooldowns = defaultdict(lambda: default_cooldown, cooldowns)
         self.permissions = self.config.get('permissions', {})
         self.rate_limits = self.config.get('rate_limits', {
             'global': [5, 5],  # [max_commands, time_window]
@@ -103,84 +107,88 @@ class AdvancedCommandHandler:
             'channel': [10, 5]
         })
         
+        self.admin_id = str(self.config.get('admin_id'))
+        
+        # Per-user command state, bounded and expired by cachetools
+        self._rate_limit_cache = TTLCache(
+            maxsize=MAX_TRACKED_USERS,
+            ttl=self.rate_limits['user'][1],
+            timer=time.monotonic
+        )
+        # (user_id, command) -> last use; expires once that command's cooldown has passed
+        self._cooldown_cache = TLRUCache(
+            maxsize=MAX_TRACKED_USERS,
+            ttu=lambda key, last_used, now: last_used + self.custom_cooldowns[key[1]],
+            timer=time.monotonic
+        )
+        self._permission_cache = TTLCache(
+            maxsize=MAX_TRACKED_USERS,
+            ttl=PERMISSION_CACHE_TTL,
+            timer=time.monotonic
+        )
+        
         # Setup logging channel
         self.log_channel_id = int(self.config.get('channels', {}).get('logs', 0))
 
     async def check_rate_limit(self, ctx: commands.Context) -> bool:
         """Check if command exceeds rate limits dengan cache"""
-        now = datetime.utcnow()
+        now = time.monotonic()
         
         # Admin bypass
-        if str(ctx.author.id) == str(self.config.get('admin_id')):
+        if str(ctx.author.id) == self.admin_id:
             return True
 
         # Get rate limit data from cache
-        cache_key = f"rate_limit:{ctx.author.id}"
-        rate_data = await self.cache_manager.get(cache_key)
-        
-        if not rate_data:
-            rate_data = {
-                'commands': [],
-                'last_reset': now.timestamp()
-            }
+        commands_used = self._rate_limit_cache.get(ctx.author.id)
+        if commands_used is None:
+            commands_used = deque()
 
-        # Cleanup old commands
-        rate_data['commands'] = [
-              cmd_time for cmd_time in rate_data['commands']
-            if (now - datetime.fromtimestamp(cmd_time)).total_seconds() <= self.rate_limits['user'][1]
-        ]
+        # Cleanup old commands; timestamps are in order, so only the head can expire
+        window = self.rate_limits['user'][1]
+        while commands_used and now - commands_used[0] > window:
+            commands_used.popleft()
 
         # Check limit
-        if len(rate_data['commands']) >= self.rate_limits['user'][0]:
+        if len(commands_used) >= self.rate_limits['user'][0]:
             return False
 
-        # Update rate limit data
-        rate_data['commands'].append(now.timestamp())
-        await self.cache_manager.set(
-            cache_key,
-            rate_data,
-            expires_in=self.rate_limits['user'][1]
-        )
+        # Update rate limit data; re-assigning refreshes the entry's TTL
+        commands_used.append(now)
+        self._rate_limit_cache[ctx.author.id] = commands_used
 
         return True
 
     async def check_cooldown(self, user_id: int, command: str) -> Tuple[bool, float]:
         """Check command cooldown dengan cache"""
-        cache_key = f"cooldown:{user_id}:{command}"
+        cache_key = (user_id, command)
         
         # Admin bypass
-        if str(user_id) == str(self.config.get('admin_id')):
+        if str(user_id) == self.admin_id:
             return True, 0
 
         # Check cooldown from cache
-        last_used = await self.cache_manager.get(cache_key)
-        if last_used:
-            cooldown_time = self.custom_cooldowns.get(
-                command, 
-                self.custom_cooldowns.get('default', 3)
-            )
-            elapsed = (datetime.utcnow() - datetime.fromtimestamp(last_used)).total_seconds()
+        now = time.monotonic()
+        cooldown_time = self.custom_cooldowns[command]
+        last_used = self._cooldown_cache.get(cache_key)
+        if last_used is not None:
+            elapsed = now - last_used
             
             if elapsed < cooldown_time:
                 return False, cooldown_time - elapsed
 
         # Set new cooldown
-        await self.cache_manager.set(
-            cache_key,
-            datetime.utcnow().timestamp(),
-            expires_in=self.custom_cooldowns.get(command, 3)
-        )
+        self._cooldown_cache[cache_key] = now
         return True, 0
 
     async def check_permissions(self, ctx: commands.Context, command: str) -> bool:
         """Check user permissions for command"""
         # Admin bypass
-        if str(ctx.author.id) == str(self.config.get('admin_id')):
+        if str(ctx.author.id) == self.admin_id:
             return True
             
         # Check cached permissions
-        cache_key = f"perms:{ctx.author.id}:{command}"
-        cached_perm = await self.cache_manager.get(cache_key)
+        cache_key = (ctx.author.id, command)
+        cached_perm = self._permission_cache.get(cache_key)
         if cached_perm is not None:
             return cached_perm
             
@@ -197,11 +205,7 @@ class AdvancedCommandHandler:
                     break
         
         # Cache permission result for 5 minutes
-        await self.cache_manager.set(
-            cache_key,
-            has_permission,
-            expires_in=300
-        )
+        self._permission_cache[cache_key] = has_permission
                     
         return has_permission
 
@@ -217,7 +221,7 @@ class AdvancedCommandHandler:
         # Create embed
         embed = discord.Embed(
             title="Command Log",
-            timestamp=datetime.utcnow(),
+            timestamp=discord.utils.utcnow(),
             color=discord.Color.green() if success else discord.Color.red()
         )
         